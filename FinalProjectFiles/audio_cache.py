@@ -0,0 +1,106 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+
+AUDIO_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+
+class AudioCache:
+    """
+    Content-addressed directory of synthesised pronunciations with an LRU size cap.
+
+    Every clip is stored under a hash of the word, voice id, rate and volume it was rendered with, so changing
+    any of them renders a new clip. Clips are kept in least-recently-used order (file modification times are
+    bumped on every hit, so the order survives restarts), and the oldest clips are evicted once the directory
+    grows past `max_bytes`.
+    """
+
+    def __init__(self, directory, max_bytes=AUDIO_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+
+        os.makedirs(directory, exist_ok=True)
+        files = [entry for entry in os.scandir(directory) if entry.name.endswith('.wav')]
+        for entry in sorted(files, key=lambda e: e.stat().st_mtime):
+            self.entries[entry.path] = entry.stat().st_size
+            self.size += entry.stat().st_size
+
+    def path_for(self, word, voice_id, rate, volume):
+        """
+        Returns the cache path of the clip of a word rendered with the given voice settings.
+        """
+        key = '\0'.join([word, str(voice_id), str(rate), str(volume)])
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.wav')
+
+    def get(self, path):
+        """
+        Returns True and marks the clip as recently used if it is in the cache.
+        """
+        if path not in self.entries:
+            return False
+
+        self.entries.move_to_end(path)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.size -= self.entries.pop(path)
+            return False
+        return True
+
+    def put(self, temp_path, path):
+        """
+        Moves a freshly rendered clip into the cache and evicts the least recently used clips past the size cap.
+        """
+        os.replace(temp_path, path)
+        size = os.path.getsize(path)
+        self.size += size - self.entries.pop(path, 0)
+        self.entries[path] = size
+
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            old_path, old_size = self.entries.popitem(last=False)
+            self.size -= old_size
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
+
+
+def find_player():
+    """
+    Returns the command line prefix of an audio player available on this system, or None if there is none.
+
+    Windows plays clips through `winsound` and needs no external player.
+    """
+    if sys.platform == 'win32':
+        return []
+    for player in (['afplay'], ['paplay'], ['aplay', '-q']):
+        if shutil.which(player[0]):
+            return player
+    return None
+
+
+def play_file(player, path, is_stale):
+    """
+    Plays a cached clip, stopping early once `is_stale()` returns True.
+
+    On Windows the clip is played synchronously through `winsound`; clips are a single word long, so they are
+    not interrupted there.
+    """
+    if sys.platform == 'win32':
+        import winsound
+        winsound.PlaySound(path, winsound.SND_FILENAME)
+        return
+
+    process = subprocess.Popen(player + [path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    while process.poll() is None:
+        if is_stale():
+            process.terminate()
+            process.wait()
+            return
+        time.sleep(0.02)
@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from dictionary import Dictionary, DuplicateEntryError, Entry
+from generate_dictionary import write_dictionary
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+
+def measure(operation, arguments):
+    """
+    Calls `operation` once per argument and returns timing statistics in microseconds.
+    """
+    samples = []
+    for argument in arguments:
+        start = time.perf_counter()
+        operation(argument)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return summarize(samples)
+
+
+def summarize(samples):
+    """
+    Returns the count, mean, median, 95th percentile and maximum of a list of timings.
+    """
+    samples = sorted(samples)
+    return {
+        'count': len(samples),
+        'mean_us': sum(samples) / len(samples),
+        'p50_us': samples[len(samples) // 2],
+        'p95_us': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'max_us': samples[-1],
+    }
+
+
+def benchmark_size(directory, rows, repeat, seed=0):
+    """
+    Generates a dictionary with `rows` records in `directory` and times every core operation on it.
+
+    Each operation is timed `repeat` times on randomly sampled words, except for loading the file, which is
+    timed once. Refreshing the dropdown is timed as a completion query on the word list kept up to date through
+    the adds, edits and deletes.
+    """
+    path = os.path.join(directory, f'dictionary_{rows}.csv')
+    write_dictionary(path, rows, seed=seed)
+    rng = random.Random(seed)
+    results = {}
+
+    start = time.perf_counter()
+    dictionary = Dictionary(path)
+    results['load'] = summarize([(time.perf_counter() - start) * 1e6])
+
+    words = rng.sample(sorted(dictionary.words()), min(repeat, len(dictionary.words())))
+    dictionary.complete("")  # builds the word list, which the adds, edits and deletes below then keep up to date
+
+    def add(word):
+        try:
+            dictionary.add(Entry(word, "noun", f"benchmark definition {rng.random()}"))
+        except DuplicateEntryError:
+            pass
+
+    def edit(word):
+        dictionary.edit(word, dictionary.count(word), Entry(word, "verb", f"edited definition {rng.random()}"))
+
+    def delete(word):
+        dictionary.delete(*dictionary.entry(word, 1)[:3])
+
+    def refresh_dropdown(word):
+        dictionary.complete(word[:3])
+
+    results['load_word'] = measure(dictionary.lookup, words)
+    results['index_lookup'] = measure(lambda word: dictionary.entry(word, dictionary.count(word)), words)
+    results['add'] = measure(add, words)
+    results['edit'] = measure(edit, words)
+    results['delete'] = measure(delete, words)
+    results['refresh_dropdown'] = measure(refresh_dropdown, words)
+
+    dictionary.close()
+    return results
+
+
+def git_version():
+    """
+    Returns the short hash of the checked out commit, or "unknown" outside a git checkout.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(sizes, repeat, seed=0):
+    """
+    Benchmarks every dictionary size in a temporary directory and returns the results with run metadata.
+    """
+    report = {
+        'version': git_version(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            report['results'][str(rows)] = benchmark_size(directory, rows, repeat, seed=seed)
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time the core dictionary operations on generated dictionaries.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.repeat, seed=args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for rows, results in report['results'].items():
+        print(f"{rows} rows")
+        for operation, stats in results.items():
+            print(f"  {operation:<18} mean {stats['mean_us']:>12.1f} us   p95 {stats['p95_us']:>12.1f} us")
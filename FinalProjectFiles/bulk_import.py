@@ -0,0 +1,182 @@
+import argparse
+import csv
+import json
+import os
+import time
+from dictionary_store import OPERATION_SIZES
+from entry import normalize_row, record_key
+from storage import open_backend
+
+BATCH_SIZE = 5000
+FORMAT_DELIMITERS = {'csv': ';', 'tsv': '\t'}
+
+
+class ImportReport:
+    """
+    Counts of a bulk import: rows read, imported and rejected (by reason), and the elapsed time.
+    """
+
+    def __init__(self):
+        self.read = 0
+        self.imported = 0
+        self.rejected = {}
+        self.seconds = 0.0
+
+    def reject(self, reason):
+        """
+        Counts one rejected row.
+        """
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+    def rows_per_second(self):
+        """
+        Returns the number of rows read per second.
+        """
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        lines = [f"Read {self.read} rows in {self.seconds:.1f} s ({self.rows_per_second():.0f} rows/s).",
+                 f"Imported {self.imported} rows."]
+        for reason, count in sorted(self.rejected.items()):
+            lines.append(f"Rejected {count} rows: {reason}.")
+        return "\n".join(lines)
+
+
+def detect_format(path):
+    """
+    Returns the source format implied by a file extension: "jsonl", "tsv" or "csv".
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    if extension == '.tsv':
+        return 'tsv'
+    return 'csv'
+
+
+def read_source(f, source_format, delimiter=None):
+    """
+    Yields the rows of an open source file one at a time, as lists of fields.
+
+    CSV and TSV rows are split on `delimiter` (a semicolon for CSV and a tab for TSV by default). JSONL lines are
+    objects with "word", "pos", "definition", "synonyms" and "antonyms" keys. A line that cannot be parsed is
+    yielded as None, so it can be counted as rejected without stopping the import.
+    """
+    if source_format == 'jsonl':
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                yield [str(item.get(field, "")) for field in ('word', 'pos', 'definition', 'synonyms', 'antonyms')]
+            except (ValueError, AttributeError):
+                yield None
+    else:
+        for row in csv.reader(f, delimiter=delimiter or FORMAT_DELIMITERS[source_format]):
+            if row:
+                yield row
+
+
+def existing_keys(backend):
+    """
+    Returns the hashes of the (word, part-of-speech, definition) keys currently stored by a backend.
+
+    The stored records and pending journal operations are streamed rather than loaded, and only a 64-bit hash of
+    each key is kept, so the set costs tens of bytes per record whatever the length of the definitions.
+    """
+    keys = set()
+    with backend.lock():
+        for row in backend.rows():
+            keys.add(hash(record_key(row)))
+
+        for op in backend.operations():
+            if len(op) != OPERATION_SIZES.get(op[0]):
+                continue
+            if op[0] == 'add':
+                keys.add(hash(record_key(normalize_row(op[1:]))))
+            elif op[0] == 'delete':
+                keys.discard(hash(record_key(normalize_row(op[1:4]))))
+            elif op[0] == 'edit':
+                keys.discard(hash(record_key(normalize_row(op[1:4]))))
+                keys.add(hash(record_key(normalize_row(op[4:]))))
+    return keys
+
+
+def import_rows(dictionary_path, rows, batch_size=BATCH_SIZE, rejects=None):
+    """
+    Appends the new, valid rows of an iterable to a dictionary and returns an ImportReport.
+
+    Rows are validated (word, part-of-speech and definition must be present) and deduplicated against the
+    dictionary and against each other by key hash, then written in batches of `batch_size` through the storage
+    backend: one journal write per batch for CSV dictionaries, one transaction per batch for SQLite. Only the
+    current batch and the key hashes are held in memory, so the source can be larger than RAM. Rejected rows are
+    written to the `rejects` CSV writer, if given, followed by the reason.
+
+    The dictionary should not be open in the application during the import.
+    """
+    report = ImportReport()
+    start = time.perf_counter()
+    backend = open_backend(dictionary_path)
+    keys = existing_keys(backend)
+    batch = []
+
+    def reject(row, reason):
+        report.reject(reason)
+        if rejects is not None:
+            rejects.writerow(list(row or []) + [reason])
+
+    try:
+        for row in rows:
+            report.read += 1
+            if row is None:
+                reject(row, "malformed line")
+                continue
+
+            entry = normalize_row(row)
+            if not entry.word or not entry.pos or not entry.definition:
+                reject(row, "missing word, part-of-speech or definition")
+                continue
+
+            key = hash(record_key(entry))
+            if key in keys:
+                reject(row, "duplicate entry")
+                continue
+
+            keys.add(key)
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                backend.add_many(batch)
+                report.imported += len(batch)
+                batch = []
+
+        if batch:
+            backend.add_many(batch)
+            report.imported += len(batch)
+    finally:
+        backend.close()
+        report.seconds = time.perf_counter() - start
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Append the entries of a CSV, TSV or JSONL file to a dictionary.")
+    parser.add_argument('dictionary')
+    parser.add_argument('source')
+    parser.add_argument('--format', choices=['csv', 'tsv', 'jsonl'], help="default: from the source extension")
+    parser.add_argument('--delimiter', help="field delimiter of CSV sources (default: semicolon)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--rejects', help="write rejected rows and the reasons to this CSV file")
+    args = parser.parse_args()
+
+    source_format = args.format or detect_format(args.source)
+    rejects_file = open(args.rejects, 'w', newline='') if args.rejects else None
+    try:
+        with open(args.source, 'r', newline='', encoding='utf-8') as f:
+            rejects_writer = csv.writer(rejects_file, delimiter=';') if rejects_file else None
+            report = import_rows(args.dictionary, read_source(f, source_format, args.delimiter),
+                                 batch_size=args.batch_size, rejects=rejects_writer)
+    finally:
+        if rejects_file:
+            rejects_file.close()
+
+    print(report)
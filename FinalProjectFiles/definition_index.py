@@ -0,0 +1,78 @@
+import heapq
+import math
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class DefinitionIndex:
+    """
+    Inverted index over the definitions of the dictionary, ranked with BM25.
+
+    Each term maps to a postings dict of {record ID: term frequency}, and the length of every indexed definition is
+    kept for length normalisation. A query only visits the postings of its own terms, so reverse lookups ("which
+    words are defined with X") never scan the whole dictionary. The index follows the dictionary store as an
+    observer: records are indexed and unindexed as they are added, edited and deleted.
+    """
+
+    def __init__(self, records=()):
+        self.postings = {}
+        self.lengths = {}
+        self.total_length = 0
+        for record_id, record in records:
+            self.record_added(record_id, record)
+
+    def record_added(self, record_id, record):
+        """
+        Indexes the definition of a record.
+        """
+        terms = tokenize(record.definition)
+        self.lengths[record_id] = len(terms)
+        self.total_length += len(terms)
+        for term in terms:
+            postings = self.postings.setdefault(term, {})
+            postings[record_id] = postings.get(record_id, 0) + 1
+
+    def record_removed(self, record_id, record):
+        """
+        Removes the definition of a record from the index.
+        """
+        self.total_length -= self.lengths.pop(record_id, 0)
+        for term in set(tokenize(record.definition)):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(record_id, None)
+                if not postings:
+                    del self.postings[term]
+
+    def search(self, query, limit=20):
+        """
+        Returns up to `limit` (record ID, score) pairs for the definitions best matching a query, best first.
+        """
+        count = len(self.lengths)
+        if not count:
+            return []
+        base_norm = BM25_K1 * (1 - BM25_B)
+        length_norm = BM25_K1 * BM25_B * count / max(1, self.total_length)
+        lengths = self.lengths
+
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            weight = (BM25_K1 + 1) * math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for record_id, frequency in postings.items():
+                norm = base_norm + length_norm * lengths[record_id]
+                scores[record_id] = scores.get(record_id, 0) + weight * frequency / (frequency + norm)
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+def tokenize(text):
+    """
+    Returns the lowercase alphanumeric terms of a text, in order.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
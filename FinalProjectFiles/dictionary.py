@@ -0,0 +1,307 @@
+import functools
+import threading
+from definition_index import DefinitionIndex
+from dictionary_store import DictionaryStore
+from entry import Entry, normalize_row
+from prefix_index import PrefixIndex
+from spelling_index import SpellingIndex
+from storage import open_backend
+from thesaurus import ThesaurusGraph
+
+
+class DictionaryError(Exception):
+    """
+    Base class of the errors raised by dictionary operations.
+    """
+
+
+class MissingInformationError(DictionaryError):
+    """
+    Raised when an entry lacks a word, part-of-speech or definition.
+    """
+
+
+class DuplicateEntryError(DictionaryError):
+    """
+    Raised when adding an entry whose word, part-of-speech and definition already exist.
+    """
+
+
+class RecordNotFoundError(DictionaryError):
+    """
+    Raised when no record matches the requested word and index, or word, part-of-speech and definition.
+    """
+
+
+class ReadOnlyError(DictionaryError):
+    """
+    Raised when changing a dictionary opened read-only.
+    """
+
+
+def synchronized(method):
+    """
+    Makes a Dictionary method hold the dictionary's lock while it runs.
+    """
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def serialized(method):
+    """
+    Makes a Dictionary method hold the dictionary's update lock while it runs, so it never overlaps another change.
+    """
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.update_lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class Dictionary:
+    """
+    Headless dictionary API used by the GUI, the command line tools and the benchmarks.
+
+    Wraps the in-memory dictionary store together with the prefix and spelling indexes of its words and the
+    full-text index of its definitions and the synonym/antonym graph, validates input, and reports failures
+    by raising `DictionaryError` subclasses instead of showing message boxes, so every operation can be run,
+    batched and timed without a display. Records are returned as `Entry` tuples.
+
+    The dictionary can be changed from a background thread (see `io_worker.py`) while the GUI thread reads it.
+    Changes, refreshes and index builds hold `update_lock`, one at a time, while they read files or build indexes;
+    they only take `lock`, which the read methods hold, for the short time they change the records and indexes
+    in memory. A read is never kept waiting behind file I/O.
+    """
+
+    def __init__(self, path):
+        self.lock = threading.RLock()
+        self.update_lock = threading.RLock()
+        self.store = DictionaryStore(open_backend(path))
+        self.word_index = self._prefix_index(self.store)
+        self.spelling_index = None
+        self.definition_index = None
+        self.thesaurus_graph = None
+
+    @synchronized
+    def words(self):
+        """
+        Returns a view of the unique words in the dictionary.
+        """
+        return self.store.words()
+
+    @synchronized
+    def complete(self, prefix, limit=50):
+        """
+        Returns up to `limit` words starting with the given prefix, in alphabetical order.
+
+        The prefix index is built when the dictionary is loaded and then follows every change to the dictionary,
+        one word at a time.
+        """
+        return self.word_index.complete(prefix, limit)
+
+    @serialized
+    def suggest(self, word, limit=5):
+        """
+        Returns up to `limit` words within two edits of a possibly misspelled word, closest first.
+
+        The spelling index is built on the first call, which takes a while on large dictionaries; from then on it
+        is kept up to date as words are added and removed, and queries take a few milliseconds.
+        """
+        if self.spelling_index is None:
+            self.spelling_index = SpellingIndex(self.store.words())
+        return self.spelling_index.suggest(word, limit)
+
+    @serialized
+    def search(self, query, limit=20):
+        """
+        Returns up to `limit` entries whose definition best matches a query, ranked with BM25.
+
+        This is the reverse lookup: finding words from words used in their meaning. A database answers it from its
+        own full-text index; otherwise the in-memory index is built on the first call and then follows every change
+        to the dictionary.
+        """
+        entries = self.store.search(query, limit)
+        if entries is not None:
+            return entries
+        if self.definition_index is None:
+            self.definition_index = DefinitionIndex(self.store.records.items())
+            self.store.observers.append(self.definition_index)
+        return [self.store.records[record_id] for record_id, score in self.definition_index.search(query, limit)]
+
+    @serialized
+    def thesaurus(self):
+        """
+        Returns the synonym/antonym graph of the dictionary (see `thesaurus.py`).
+
+        The graph is built on the first call and then follows every change to the dictionary.
+        """
+        if self.thesaurus_graph is None:
+            self.thesaurus_graph = ThesaurusGraph(self.store.records.items())
+            self.store.observers.append(self.thesaurus_graph)
+        return self.thesaurus_graph
+
+    @synchronized
+    def lookup(self, word):
+        """
+        Returns the entries of a word in file order, or an empty list if the word is unknown.
+        """
+        return self.store.definitions(word)
+
+    @synchronized
+    def count(self, word):
+        """
+        Returns the number of entries of a word.
+        """
+        return self.store.count(word)
+
+    @synchronized
+    def entry(self, word, index):
+        """
+        Returns the entry at the given 1-based index among the definitions of a word.
+
+        Returns None if the word is unknown or the index is out of range.
+        """
+        return self.store.record(word, index)
+
+    @serialized
+    def add(self, entry):
+        """
+        Adds an entry to the dictionary.
+
+        Raises MissingInformationError if the word, part-of-speech or definition is empty, and DuplicateEntryError
+        if an entry with the same word, part-of-speech and definition already exists.
+        """
+        entry = normalize_row(entry)
+        if not entry.word or not entry.pos or not entry.definition:
+            raise MissingInformationError("Please enter a word, part-of-speech, and definition.")
+        if self.store.contains(entry.word, entry.pos, entry.definition):
+            raise DuplicateEntryError("The entry already exists.")
+
+        with self.lock:
+            self.store.add(entry)
+            if self.store.count(entry.word) == 1:
+                self._word_added(entry.word)
+        self.store.compact_if_needed()
+        return entry
+
+    @serialized
+    def edit(self, word, index, entry):
+        """
+        Replaces the entry at the given 1-based index among the definitions of a word.
+
+        Raises RecordNotFoundError if there is no such entry.
+        """
+        entry = normalize_row(entry)
+        with self.lock:
+            if not self.store.edit(word, index, entry):
+                raise RecordNotFoundError("No record found with the provided information.")
+
+            if entry.word != word:
+                if self.store.count(word) == 0:
+                    self._word_removed(word)
+                if self.store.count(entry.word) == 1:
+                    self._word_added(entry.word)
+        self.store.compact_if_needed()
+        return entry
+
+    @serialized
+    def delete(self, word, pos, definition):
+        """
+        Deletes every entry with the given word, part-of-speech and definition.
+
+        Raises MissingInformationError if any of them is empty and RecordNotFoundError if nothing matches.
+        """
+        if not word or not pos or not definition:
+            raise MissingInformationError("Please provide the word, part of speech, and definition.")
+        with self.lock:
+            if not self.store.delete(word, pos, definition):
+                raise RecordNotFoundError("No record found with the provided information.")
+
+            if self.store.count(word) == 0:
+                self._word_removed(word)
+        self.store.compact_if_needed()
+
+    @serialized
+    def refresh(self):
+        """
+        Picks up the changes other instances of the application have made to the dictionary.
+
+        Returns the set of words whose entries changed, or None if the whole dictionary had to be reloaded (after
+        another instance compacted the journal, or changed an SQLite database). Only the new journal rows are read
+        and only the words they touch are updated in the indexes; after a reload, the prefix index is rebuilt
+        with the new records and the other indexes on their next use.
+
+        The files are read, and a reloaded dictionary and its prefix index built, before the lock the read methods
+        hold is taken to put the changes in place.
+        """
+        ops = self.store.changes()
+        if ops is None:
+            store = DictionaryStore(self.store.backend)
+            word_index = self._prefix_index(store)
+            with self.lock:
+                self.store = store
+                self.word_index = word_index
+                self.spelling_index = None
+                self.definition_index = None
+                self.thesaurus_graph = None
+            return None
+        if not ops:
+            return set()
+
+        with self.lock:
+            touched = self.store.apply(ops)
+            for word, existed in touched.items():
+                exists = self.store.count(word) > 0
+                if exists and not existed:
+                    self._word_added(word)
+                elif existed and not exists:
+                    self._word_removed(word)
+        self.store.compact_if_needed()
+        return set(touched)
+
+    def flush(self):
+        """
+        Writes the changes still buffered in memory to disk.
+
+        Changes are saved in batches shortly after they are made (see `storage.py`); call this to save them now,
+        for example before the application exits. Raises OSError if they cannot be written.
+        """
+        self.store.flush()
+
+    def raise_write_error(self):
+        """
+        Raises OSError if saving buffered changes in the background has failed since the last call.
+
+        The changes stay in memory and saving them is retried; this only reports the failure, once.
+        """
+        error = self.store.take_write_error()
+        if error is not None:
+            raise OSError(f"Could not save the latest changes, retrying: {error}") from error
+
+    @serialized
+    def close(self):
+        """
+        Closes the underlying storage, waiting for any pending writes.
+        """
+        self.store.close()
+
+    @staticmethod
+    def _prefix_index(store):
+        word_index = PrefixIndex({word: store.count(word) for word in store.words()})
+        store.observers.append(word_index)
+        return word_index
+
+    def _word_added(self, word):
+        if self.spelling_index is not None:
+            self.spelling_index.add(word)
+
+    def _word_removed(self, word):
+        if self.spelling_index is not None:
+            self.spelling_index.remove(word)
+
+
+__all__ = ['Dictionary', 'DictionaryError', 'DuplicateEntryError', 'Entry', 'MissingInformationError',
+           'RecordNotFoundError']
@@ -0,0 +1,300 @@
+import contextlib
+from bisect import insort
+from entry import key_hash, normalize_row, record_key
+from record_table import RecordTable
+
+OPERATION_SIZES = {'add': 6, 'delete': 4, 'edit': 9}
+
+
+class DictionaryStore:
+    """
+    In-memory index over a dictionary storage backend.
+
+    The backend is read once when the store is created. Every record gets an integer record ID in file order, and
+    the records are kept in a compact columnar table keyed by that ID (see `record_table.py`), which reads like a
+    dict of `Entry` tuples. Two hash indexes point into it: one from each word to the ordered list of its record
+    IDs, so "the Nth definition of a word" is a direct lookup, and one from a hash of each (word, part-of-speech,
+    definition) key (see `entry.key_hash`) to the ID of its record, or the ordered list of IDs when several
+    records share the hash, so duplicate checks, deletes and replayed changes decode only the records with that
+    key hash, even for words with thousands of definitions. Changes are passed on to the backend (see `storage.py`) as they happen; they only touch memory,
+    as the backend buffers them and writes them from another thread, and the file work that can follow a change,
+    compacting the backend, is left to the caller through `compact_if_needed`.
+
+    Secondary indexes can follow the records by registering in `observers`: each observer's
+    `record_added(record_id, record)` and `record_removed(record_id, record)` are called for every record that
+    enters or leaves the store, including during journal replay. An edit is reported as a removal followed by an
+    addition under the same record ID.
+
+    A store created with `read_only` only reads the backend: it does not take the backend's lock, use or write
+    its cache, or compact it, and must not be changed.
+    """
+
+    def __init__(self, backend, read_only=False):
+        self.backend = backend
+        self.read_only = read_only
+        self.records = RecordTable()
+        self.by_word = {}
+        self.by_key = {}
+        self.observers = []
+        self.load()
+
+    def load(self):
+        """
+        Reads the records of the backend, replays its pending operations and rebuilds the in-memory indexes.
+
+        Every row is padded to five columns and stripped, so the rest of the application can rely on a
+        uniform (word, part-of-speech, definition, synonyms, antonyms) layout. A journal that was already past the
+        compaction threshold, for example after a bulk import, is compacted straight away.
+
+        The record table and the word and key indexes built from the backend's records are cached by the backend,
+        when it supports it, and taken from the cache instead of parsing the records again while they are unchanged.
+        """
+        with contextlib.nullcontext() if self.read_only else self.backend.lock():
+            cached = None if self.read_only else self.backend.read_cache()
+            if cached is not None:
+                self.records, self.by_word, self.by_key = cached
+            else:
+                self.records = RecordTable()
+                self.by_word = {}
+                self.by_key = {}
+                for row in self.backend.rows():
+                    self._insert(row)
+                if not self.read_only:
+                    self.backend.write_cache((self.records, self.by_word, self.by_key))
+
+            for op in self.backend.operations():
+                self._replay(op)
+
+        if not self.read_only:
+            self.compact_if_needed()
+
+    def changes(self):
+        """
+        Returns the operations that other instances sharing the backend have journaled since it was last read.
+
+        Returns None if the backend has to be loaded again from scratch, into a new store. The changes still
+        buffered by the backend are written first, so a reload does not lose them. Only reads files: pass the
+        operations to `apply` to change the records.
+        """
+        self.backend.flush()
+        return self.backend.changes()
+
+    def apply(self, ops):
+        """
+        Replays operations returned by `changes` on the records.
+
+        Only those operations are replayed, so observers are told about the records they touch and nothing else.
+        Returns a {word: whether it had records before} dict of the words they touched.
+        """
+        touched = {}
+        for op in ops:
+            if len(op) != OPERATION_SIZES.get(op[0]):
+                continue
+            words = [op[1:2], op[4:5]] if op[0] == 'edit' else [op[1:2]]
+            for word in (normalize_row(word).word for word in words):
+                touched.setdefault(word, word in self.by_word)
+            self._replay(op)
+        return touched
+
+    def words(self):
+        """
+        Returns a view of the unique words in the dictionary.
+        """
+        return self.by_word.keys()
+
+    def definitions(self, word):
+        """
+        Returns the records of a word in file order, or an empty list if the word is unknown.
+        """
+        return [self.records[record_id] for record_id in self.by_word.get(word, ())]
+
+    def count(self, word):
+        """
+        Returns the number of records of a word.
+        """
+        return len(self.by_word.get(word, ()))
+
+    def record_id(self, word, index):
+        """
+        Returns the ID of the record at the given 1-based index among the definitions of a word.
+
+        Returns None if the word is unknown or the index is out of range.
+        """
+        ids = self.by_word.get(word)
+        if not ids or index < 1 or index > len(ids):
+            return None
+        return ids[index - 1]
+
+    def record(self, word, index):
+        """
+        Returns the record at the given 1-based index among the definitions of a word.
+
+        Returns None if the word is unknown or the index is out of range.
+        """
+        record_id = self.record_id(word, index)
+        if record_id is None:
+            return None
+        return self.records[record_id]
+
+    def contains(self, word, pos, definition):
+        """
+        Checks whether a record with the given word, part-of-speech and definition exists.
+        """
+        return bool(self._find((word, pos, definition)))
+
+    def add(self, row):
+        """
+        Adds a record to the dictionary and passes it on to the backend.
+        """
+        row = normalize_row(row)
+        self._insert(row)
+        self.backend.add(row)
+
+    def delete(self, word, pos, definition):
+        """
+        Deletes every record matching the given word, part-of-speech and definition.
+
+        Returns True if anything was deleted, in which case the deletion is passed on to the backend.
+        """
+        key = (word, pos, definition)
+        if not self._remove(key):
+            return False
+
+        self.backend.delete(key)
+        return True
+
+    def edit(self, word, index, row):
+        """
+        Replaces the record at the given 1-based index among the definitions of a word.
+
+        The record keeps its ID, and so its position in the file. Returns True if the record existed, in which
+        case the old key and the new record are passed on to the backend.
+        """
+        record_id = self.record_id(word, index)
+        if record_id is None:
+            return False
+
+        old_key = record_key(self.records[record_id])
+        new_row = normalize_row(row)
+        self._replace(record_id, new_row)
+        self.backend.edit(old_key, new_row)
+        return True
+
+    def search(self, query, limit=20):
+        """
+        Returns up to `limit` records whose definition best matches a query, from the backend's full-text index.
+
+        Returns None if the backend has no full-text index of its own.
+        """
+        return self.backend.search(query, limit)
+
+    def flush(self):
+        """
+        Writes the changes still buffered by the backend to disk.
+        """
+        self.backend.flush()
+
+    def take_write_error(self):
+        """
+        Returns, once, the error of the last background write of buffered changes that failed, or None.
+        """
+        return self.backend.take_write_error()
+
+    def close(self):
+        """
+        Closes the storage backend, waiting for any pending writes.
+        """
+        self.backend.close()
+
+    def compact_if_needed(self):
+        """
+        Starts compacting the backend if its journal has grown past the threshold, with a copy of the records.
+
+        Call it after changes, while no other thread changes the store.
+        """
+        if self.backend.needs_compaction():
+            self.backend.compact(self.records.copy().values())
+
+    def _find(self, key):
+        ids = self.by_key.get(key_hash(key))
+        if ids is None:
+            return []
+        if type(ids) is int:
+            ids = (ids,)
+        return [record_id for record_id in ids if record_key(self.records[record_id]) == key]
+
+    def _index_key(self, key, record_id):
+        # A single ID is stored as is: most keys belong to one record, and a list per record would double the
+        # size of the index.
+        hashed = key_hash(key)
+        ids = self.by_key.get(hashed)
+        if ids is None:
+            self.by_key[hashed] = record_id
+        elif type(ids) is int:
+            self.by_key[hashed] = sorted((ids, record_id))
+        else:
+            insort(ids, record_id)
+
+    def _unindex_key(self, key, record_id):
+        hashed = key_hash(key)
+        ids = self.by_key[hashed]
+        if type(ids) is int:
+            del self.by_key[hashed]
+        else:
+            ids.remove(record_id)
+            if len(ids) == 1:
+                self.by_key[hashed] = ids[0]
+
+    def _replay(self, op):
+        if len(op) != OPERATION_SIZES.get(op[0]):
+            return  # a malformed row, not a change
+        if op[0] == 'add':
+            row = normalize_row(op[1:])
+            if not self._find(record_key(row)):
+                self._insert(row)
+        elif op[0] == 'delete':
+            self._remove(record_key(normalize_row(op[1:4])))
+        elif op[0] == 'edit':
+            ids = self._find(record_key(normalize_row(op[1:4])))
+            if ids:
+                self._replace(ids[0], normalize_row(op[4:]))
+
+    def _insert(self, row):
+        record_id = self.records.append(row)
+        self.by_word.setdefault(row[0], []).append(record_id)
+        self._index_key(record_key(row), record_id)
+        for observer in self.observers:
+            observer.record_added(record_id, row)
+
+    def _remove(self, key):
+        ids = self._find(key)
+        if not ids:
+            return False
+
+        group = self.by_word[key[0]]
+        for record_id in ids:
+            row = self.records.pop(record_id)
+            group.remove(record_id)
+            self._unindex_key(key, record_id)
+            for observer in self.observers:
+                observer.record_removed(record_id, row)
+        if not group:
+            del self.by_word[key[0]]
+        return True
+
+    def _replace(self, record_id, new_row):
+        old_row = self.records[record_id]
+        self.records.replace(record_id, new_row)
+        self._unindex_key(record_key(old_row), record_id)
+        self._index_key(record_key(new_row), record_id)
+        for observer in self.observers:
+            observer.record_removed(record_id, old_row)
+            observer.record_added(record_id, new_row)
+
+        if new_row[0] != old_row[0]:
+            group = self.by_word[old_row[0]]
+            group.remove(record_id)
+            if not group:
+                del self.by_word[old_row[0]]
+            # Record IDs follow file order, so inserting in ID order keeps the new word's group in file order.
+            insort(self.by_word.setdefault(new_row[0], []), record_id)
@@ -0,0 +1,39 @@
+import zlib
+from typing import NamedTuple
+
+
+class Entry(NamedTuple):
+    """
+    One dictionary record: a single definition of a word.
+
+    Synonyms and antonyms are kept as the comma-separated strings stored in the dictionary file.
+    """
+    word: str
+    pos: str
+    definition: str
+    synonyms: str = ""
+    antonyms: str = ""
+
+
+def normalize_row(row):
+    """
+    Returns an Entry built from a row stripped and padded (or truncated) to the five dictionary columns.
+    """
+    row = [field.strip() for field in row[:5]]
+    return Entry(*row, *[''] * (5 - len(row)))
+
+
+def record_key(row):
+    """
+    Returns the (word, part-of-speech, definition) key identifying a record.
+    """
+    return row[0], row[1], row[2]
+
+
+def key_hash(key):
+    """
+    Returns a 32-bit hash of a record key that is the same in every process, unlike `hash`.
+
+    Two keys can share a hash, so records found through it still have to be compared with the key.
+    """
+    return zlib.crc32('\x1f'.join(key).encode())
@@ -0,0 +1,71 @@
+import argparse
+import csv
+import random
+from itertools import accumulate
+
+PARTS_OF_SPEECH = ["noun", "verb", "adjective", "adverb", "other"]
+PART_OF_SPEECH_WEIGHTS = [50, 25, 15, 7, 3]
+SYLLABLES = ["ba", "ce", "di", "fo", "gu", "ha", "je", "ki", "lo", "mu", "na", "pe", "qui", "ro", "su", "ta", "ve",
+             "wi", "xo", "yu", "za", "ar", "en", "is", "on", "ul", "str", "pl", "tr", "ch"]
+DEFINITION_WORDS = ["a", "an", "the", "of", "to", "in", "for", "with", "or", "and", "something", "person", "place",
+                    "act", "state", "quality", "make", "cause", "become", "small", "large", "quick", "slow",
+                    "picture", "sound", "move", "object", "feeling", "kind", "part", "group", "water", "light",
+                    "time", "way", "use", "form", "line", "body", "hand", "house", "work", "game", "win", "loss"]
+
+
+def generate_rows(rows, seed=0, zipf_exponent=1.0, thesaurus=True):
+    """
+    Yields `rows` realistic dictionary records.
+
+    Headwords are drawn from a Zipfian distribution over a vocabulary of about a third as many invented words,
+    so a few words get dozens of definitions while most get one or two, as in a real dictionary. Definitions are
+    4-12 random words long. With `thesaurus`, about half the records list up to three other headwords as synonyms
+    and a quarter list antonyms.
+    """
+    rng = random.Random(seed)
+    vocabulary = invent_words(rng, max(1, rows // 3))
+    cum_weights = list(accumulate(1 / rank ** zipf_exponent for rank in range(1, len(vocabulary) + 1)))
+
+    for word in rng.choices(vocabulary, cum_weights=cum_weights, k=rows):
+        pos = rng.choices(PARTS_OF_SPEECH, PART_OF_SPEECH_WEIGHTS)[0]
+        definition = " ".join(rng.choices(DEFINITION_WORDS, k=rng.randint(4, 12)))
+        synonyms = ""
+        antonyms = ""
+        if thesaurus:
+            if rng.random() < 0.5:
+                synonyms = ", ".join(rng.sample(vocabulary, min(len(vocabulary), rng.randint(1, 3))))
+            if rng.random() < 0.25:
+                antonyms = ", ".join(rng.sample(vocabulary, min(len(vocabulary), rng.randint(1, 3))))
+        yield [word, pos, definition, synonyms, antonyms]
+
+
+def invent_words(rng, count):
+    """
+    Returns `count` distinct invented words built from random syllables, in random order.
+    """
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(1, 5))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def write_dictionary(path, rows, seed=0, thesaurus=True):
+    """
+    Writes a semicolon-delimited dictionary file with `rows` generated records.
+    """
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerows(generate_rows(rows, seed=seed, thesaurus=thesaurus))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic semicolon-delimited dictionary file.")
+    parser.add_argument('path')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-thesaurus', action='store_true', help="leave the synonyms and antonyms empty")
+    args = parser.parse_args()
+
+    write_dictionary(args.path, args.rows, seed=args.seed, thesaurus=not args.no_thesaurus)
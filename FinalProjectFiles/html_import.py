@@ -0,0 +1,144 @@
+import argparse
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from bulk_import import BATCH_SIZE, import_rows
+
+SELECTORS = {
+    'entry': '.entry',
+    'word': '.headword',
+    'sense': '.sense',
+    'pos': '.pos',
+    'definition': '.definition',
+    'synonyms': '.synonyms li',
+    'antonyms': '.antonyms li',
+}
+
+_parser = None
+
+
+class PageParser:
+    """
+    Extracts dictionary rows from saved HTML pages with BeautifulSoup and soupsieve.
+
+    A page holds one or more entries; each entry has a headword and one or more senses, and each sense a definition
+    and optionally a part-of-speech (falling back on the entry's), synonyms and antonyms. The CSS selectors of every
+    field are compiled once, when the parser is created, and reused for every page.
+    """
+
+    def __init__(self, selectors=None):
+        import soupsieve
+        from bs4 import BeautifulSoup
+
+        self.soup = BeautifulSoup
+        self.selectors = {name: soupsieve.compile(selector)
+                          for name, selector in dict(SELECTORS, **(selectors or {})).items()}
+
+    def parse(self, html):
+        """
+        Returns the [word, pos, definition, synonyms, antonyms] rows of a page, in document order.
+        """
+        rows = []
+        document = self.soup(html, 'html.parser')
+        for entry in self.selectors['entry'].select(document):
+            word = self._text(entry, 'word')
+            entry_pos = self._text(entry, 'pos')
+            for sense in self.selectors['sense'].select(entry) or [entry]:
+                rows.append([word, self._text(sense, 'pos') or entry_pos, self._text(sense, 'definition'),
+                             self._list(sense, 'synonyms'), self._list(sense, 'antonyms')])
+        return rows
+
+    def _text(self, element, field):
+        match = self.selectors[field].select_one(element)
+        return match.get_text(" ", strip=True) if match is not None else ""
+
+    def _list(self, element, field):
+        return ", ".join(match.get_text(" ", strip=True) for match in self.selectors[field].select(element))
+
+
+def start_worker(selectors):
+    """
+    Creates the page parser of a worker process.
+    """
+    global _parser
+    _parser = PageParser(selectors)
+
+
+def parse_page(path):
+    """
+    Returns the rows of an HTML page, or None if the page cannot be read or parsed. Runs in a worker process.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return _parser.parse(f.read())
+    except Exception:
+        return None
+
+
+def find_pages(directory):
+    """
+    Yields the paths of the .html and .htm files under a directory, in a stable order.
+    """
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(('.html', '.htm')):
+                yield os.path.join(root, name)
+
+
+def parse_pages(paths, selectors=None, workers=None, failed=None):
+    """
+    Parses HTML pages in a pool of worker processes and yields their rows as the pages are done.
+
+    At most a few pages per worker are queued at a time, so the paths can be a lazy iterable of any length and
+    memory use does not grow with the number of pages. Rows come back in completion order rather than page order.
+    The paths of the pages that could not be parsed are appended to `failed`, if given.
+    """
+    PageParser(selectors)  # fails here, rather than in every worker, if bs4 is missing or a selector is invalid
+    paths = iter(paths)
+    workers = workers or os.cpu_count() or 1
+    limit = workers * 4
+    with ProcessPoolExecutor(workers, initializer=start_worker, initargs=(selectors,)) as executor:
+        pending = {}
+        while True:
+            for path in paths:
+                pending[executor.submit(parse_page, path)] = path
+                if len(pending) >= limit:
+                    break
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                rows = future.result()
+                if rows is None:
+                    if failed is not None:
+                        failed.append(path)
+                    continue
+                yield from rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Append the entries of a directory of saved HTML dictionary pages "
+                                                 "to a dictionary.")
+    parser.add_argument('dictionary')
+    parser.add_argument('pages', help="directory searched recursively for .html and .htm files")
+    parser.add_argument('--selectors', help="JSON file overriding the CSS selectors of: " + ", ".join(SELECTORS))
+    parser.add_argument('--workers', type=int, help="number of worker processes (default: one per core)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    selectors = None
+    if args.selectors:
+        with open(args.selectors) as f:
+            selectors = json.load(f)
+
+    failed = []
+    report = import_rows(args.dictionary, parse_pages(find_pages(args.pages), selectors, args.workers, failed),
+                         batch_size=args.batch_size)
+    print(report)
+    if failed:
+        print(f"Could not parse {len(failed)} pages:")
+        for path in failed:
+            print(f"  {path}")
@@ -0,0 +1,121 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class Job:
+    """
+    A function submitted to the I/O worker, with the callbacks to run on the GUI thread once it has finished.
+
+    `message` describes the job for the busy indicator; jobs without one run silently in the background and never
+    make the worker busy. Only `cancellable` jobs are affected by `IoWorker.cancel`.
+    """
+
+    def __init__(self, function, args, on_done=None, on_error=None, message=None, cancellable=False):
+        self.function = function
+        self.args = args
+        self.on_done = on_done
+        self.on_error = on_error
+        self.message = message
+        self.cancellable = cancellable
+        self.cancelled = False
+        self.future = None
+
+
+class IoWorker:
+    """
+    Background thread running the dictionary operations that read or write files or may take a while.
+
+    Jobs run one at a time, in submission order, on a single-thread executor, so the Tk main loop never waits for
+    the disk. A finished job is put on the `results` queue with its return value or the exception it raised; the
+    GUI drains the queue with `poll` from a `window.after` callback, which runs the job's callbacks on the GUI
+    thread. Cancelling a job that has not started yet drops it; a job that is already running finishes in the
+    background, but its result is discarded.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.results = queue.Queue()
+        self.pending = []
+
+    def submit(self, function, *args, on_done=None, on_error=None, message=None, cancellable=False):
+        """
+        Queues `function(*args)` and returns its Job.
+
+        `on_done(value)` is called with the return value, or `on_error(exception)` with the exception raised; an
+        exception without an `on_error` callback is raised again by `poll`.
+        """
+        job = Job(function, args, on_done, on_error, message, cancellable)
+        job.future = self.executor.submit(self._run, job)
+        self.pending.append(job)
+        return job
+
+    def current(self):
+        """
+        Returns the oldest job with a message that has not finished and has not been cancelled, or None.
+        """
+        for job in self.pending:
+            if job.message and not job.cancelled:
+                return job
+        return None
+
+    def busy(self):
+        """
+        Checks whether a job the user is waiting for is waiting or running. Silent jobs are not counted.
+        """
+        return self.current() is not None
+
+    def idle(self):
+        """
+        Checks whether no job at all, silent ones included, is waiting or running.
+        """
+        return not self.pending
+
+    def cancel(self):
+        """
+        Cancels every cancellable job that has not finished.
+        """
+        for job in list(self.pending):
+            if job.cancellable:
+                job.cancelled = True
+                if job.future.cancel():
+                    self.pending.remove(job)
+
+    def poll(self):
+        """
+        Runs the callbacks of the jobs finished since the last call, without blocking.
+        """
+        while True:
+            try:
+                job, value, error = self.results.get_nowait()
+            except queue.Empty:
+                return
+
+            self.pending.remove(job)
+            if job.cancelled:
+                continue
+            if error is None:
+                if job.on_done is not None:
+                    job.on_done(value)
+            elif job.on_error is not None:
+                job.on_error(error)
+            else:
+                raise error
+
+    def wait(self):
+        """
+        Blocks until every job that has not been cancelled has finished. Their callbacks run on the next `poll`.
+        """
+        wait([job.future for job in self.pending if not job.cancelled])
+
+    def stop(self):
+        """
+        Drops the cancellable jobs and waits for the others to finish, such as pending saves.
+        """
+        self.cancel()
+        self.executor.shutdown(wait=True)
+
+    def _run(self, job):
+        try:
+            self.results.put((job, job.function(*job.args), None))
+        except Exception as e:
+            self.results.put((job, None, e))
@@ -0,0 +1,141 @@
+import functools
+import json
+import time
+from array import array
+
+RING_SIZE = 1024
+
+recorder = None
+
+
+class OperationStats:
+    """
+    Latency statistics of one operation.
+
+    The call count and mean cover every call. The latest `size` durations are kept in a fixed ring buffer, which the
+    percentiles and the maximum are computed from, so memory stays constant however long the application runs.
+    """
+
+    def __init__(self, size=RING_SIZE):
+        self.samples = array('d', bytes(8 * size))
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        """
+        Records the duration of one call.
+        """
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+        self.total += seconds
+
+    def summary(self):
+        """
+        Returns the count, mean, median, 95th and 99th percentiles and maximum, in microseconds.
+        """
+        recent = sorted(self.samples[:min(self.count, len(self.samples))])
+        return {
+            'count': self.count,
+            'mean_us': self.total / self.count * 1e6,
+            'p50_us': recent[len(recent) // 2] * 1e6,
+            'p95_us': recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1e6,
+            'p99_us': recent[min(len(recent) - 1, int(len(recent) * 0.99))] * 1e6,
+            'max_us': recent[-1] * 1e6,
+        }
+
+
+class LatencyRecorder:
+    """
+    Latency statistics of the operations of the application, by operation name.
+    """
+
+    def __init__(self):
+        self.operations = {}
+        self.running = []
+
+    def record(self, name, seconds):
+        """
+        Records the duration of one call of an operation.
+        """
+        stats = self.operations.get(name)
+        if stats is None:
+            stats = self.operations[name] = OperationStats()
+        stats.add(seconds)
+
+    def summary(self):
+        """
+        Returns the statistics of every operation called so far, by operation name.
+        """
+        return {name: stats.summary() for name, stats in sorted(self.operations.items())}
+
+
+def enable():
+    """
+    Starts recording the latency of the operations decorated with `timed` from now on.
+
+    Must be called before the operations are defined: while recording is disabled, `timed` leaves functions
+    untouched, so instrumentation costs nothing.
+    """
+    global recorder
+    if recorder is None:
+        recorder = LatencyRecorder()
+
+
+def timed(function):
+    """
+    Records the duration of every call of a function under its name, if recording is enabled.
+    """
+    if recorder is None:
+        return function
+
+    @functools.wraps(function)
+    def timed_function(*args, **kwargs):
+        recorder.running.append(function.__name__)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            recorder.record(function.__name__, time.perf_counter() - start)
+            recorder.running.pop()
+    return timed_function
+
+
+def track(callback):
+    """
+    Returns `callback` wrapped to record the time from now until it is called, or `callback` itself.
+
+    Meant for the operations that hand work to a background thread: called from a `timed` function, the time
+    until the result is delivered is recorded as "<function> (completed)". Outside a timed function, or with
+    recording disabled, nothing is recorded.
+    """
+    if recorder is None or not recorder.running:
+        return callback
+
+    name = recorder.running[-1] + " (completed)"
+    start = time.perf_counter()
+
+    def tracked(*args, **kwargs):
+        recorder.record(name, time.perf_counter() - start)
+        return callback(*args, **kwargs)
+    return tracked
+
+
+def format_summary():
+    """
+    Returns the statistics of every operation as a text table.
+    """
+    lines = [f"{'operation':<34} {'count':>7} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+    for name, stats in (recorder.summary() if recorder is not None else {}).items():
+        lines.append(f"{name:<34} {stats['count']:>7} {stats['mean_us'] / 1000:>9.2f} {stats['p50_us'] / 1000:>9.2f} "
+                     f"{stats['p95_us'] / 1000:>9.2f} {stats['p99_us'] / 1000:>9.2f}")
+    return "\n".join(lines)
+
+
+def dump(path):
+    """
+    Writes the statistics of every operation to a JSON file, if recording is enabled.
+    """
+    if recorder is None:
+        return
+    with open(path, 'w') as f:
+        json.dump(recorder.summary(), f, indent=2)
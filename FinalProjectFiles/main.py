@@ -1,144 +1,314 @@
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import Scrollbar
-import csv
-import pyttsx3
+import sys
+import latency
+from dictionary import Dictionary, DuplicateEntryError, Entry, MissingInformationError, RecordNotFoundError
+from io_worker import IoWorker
+from mapped_dictionary import MappedDictionary
+from speech import SpeechWorker
+from virtual_listbox import VirtualListbox
+
+READ_ONLY = '--read-only' in sys.argv[1:]
+STATS = '--stats' in sys.argv[1:]
+ARGUMENTS = [argument for argument in sys.argv[1:] if argument not in ('--read-only', '--stats')]
+DICTIONARY_PATH = ARGUMENTS[0] if ARGUMENTS else 'dictionary.csv'
+COMPLETION_DELAY_MS = 150
+COMPLETION_LIMIT = 50
+SPEECH_POLL_MS = 100
+CHANGE_POLL_MS = 1000
+IO_POLL_MS = 50
+LOADED_LABELS = ["", "Part-of-speech: ", "Definition: ", "Synonyms: ", "Antonyms: "]
+REFRESHED_LABELS = ["Part-of-Speech: ", "Definition: ", "Synonyms: ", "Antonyms: ", ""]
+MEANING_SEARCH_LIMIT = 100
+RELATED_WORDS_DEPTH = 2
+AUDIO_CACHE_DIRECTORY = 'audio_cache'
+STATS_PATH = 'latency_stats.json'
+STATS_REFRESH_MS = 1000
+
+if STATS:
+    latency.enable()
+
+speech_worker = SpeechWorker(AUDIO_CACHE_DIRECTORY)
+io_worker = IoWorker()
+dictionary = None
+pending_completion = None
+suggestion_prefix = None
+
+
+def load_dictionary():
+    """
+    Loads the dictionary file on the I/O worker (`io_worker`).
+
+    The window is shown straight away with a busy indicator, and the dictionary becomes available once the file
+    has been read, however slow the disk it is on. With `--read-only`, the dictionary is opened as a memory-mapped
+    lookup file instead (see `mapped_dictionary.py`), which suits very large dictionaries that are never edited.
+    """
+    def loaded(result):
+        global dictionary
+        dictionary = result
+        update_completions()
+        window.after(CHANGE_POLL_MS, poll_changes)
+
+    def failed(error):
+        messagebox.showerror("Loading Failed", f"Could not load the dictionary: {error}")
+
+    io_worker.submit(MappedDictionary if READ_ONLY else Dictionary, DICTIONARY_PATH, on_done=loaded, on_error=failed,
+                     message="Loading the dictionary...")
+
+
+def start_job(function, on_done, errors=None, message=None, cancellable=False):
+    """
+    Runs a dictionary operation on the I/O worker (`io_worker`) and calls `on_done` with its result.
+
+    The operation runs on its own thread, so the window stays responsive while files are read and written.
+    Only one operation runs at a time; while one is in progress, the user is asked to wait. Silent background
+    jobs, such as the check for changes made by other instances, do not count: the operation is queued behind
+    them on the worker and runs as soon as they are done. `errors` maps
+    exception types to the title of the warning shown when the operation raises them, and any other exception is
+    shown as an error. The busy indicator shows `message` until the operation has finished or been cancelled.
+    If saving earlier changes in the background has failed since the last operation, that error is shown
+    instead and the operation is not run.
+    """
+    if dictionary is None or io_worker.busy():
+        messagebox.showinfo("Please Wait", "The dictionary is busy. Please try again in a moment.")
+        return
+
+    def failed(error):
+        for error_type, title in (errors or {}).items():
+            if isinstance(error, error_type):
+                messagebox.showwarning(title, str(error))
+                return
+        messagebox.showerror("Operation Failed", str(error))
+
+    def run():
+        dictionary.raise_write_error()
+        return function()
+
+    io_worker.submit(run, on_done=latency.track(on_done), on_error=failed, message=message, cancellable=cancellable)
+    update_busy_indicator()
+
+
+def poll_io():
+    """
+    Handles the operations finished by the I/O worker.
+
+    Runs every `IO_POLL_MS` milliseconds on the Tk main loop: the callbacks of the finished operations are run
+    and the busy indicator is updated.
+    """
+    window.after(IO_POLL_MS, poll_io)
+    io_worker.poll()
+    update_busy_indicator()
+
+
+def update_busy_indicator():
+    """
+    Shows the operation in progress, if any, next to the cancel button, and a busy cursor.
+
+    The cancel button is only enabled for operations that can be cancelled.
+    """
+    job = io_worker.current()
+    if job is not None and job.message:
+        status_label.config(text=job.message)
+        cancel_button.config(state=tk.NORMAL if job.cancellable else tk.DISABLED)
+        window.config(cursor="watch")
+    else:
+        status_label.config(text="")
+        cancel_button.config(state=tk.DISABLED)
+        window.config(cursor="")
+
+
+def cancel_job():
+    """
+    Cancels the operation in progress, so the window stops waiting for it.
+    """
+    io_worker.cancel()
+    update_busy_indicator()
+
 
-engine = pyttsx3.init()
+def close_window():
+    """
+    Saves the pending changes to the dictionary file and closes the window.
+
+    Changes are written to disk in batches shortly after they are made, so when the window is closed the operations
+    still running are cancelled or finished and the changes not yet written are flushed before the application
+    exits. If they cannot be written, the user is asked whether to close anyway and lose them.
+    """
+    io_worker.cancel()
+    io_worker.wait()
+    if dictionary is not None:
+        try:
+            dictionary.flush()
+        except OSError as e:
+            if not messagebox.askyesno("Saving Failed", f"Could not save the latest changes: {e}\n\n"
+                                                        "Close anyway and lose them?"):
+                return
+    window.destroy()
+
+
+def show_statistics():
+    """
+    Opens the diagnostics window, showing the latency statistics of the operations run so far.
+
+    Only available with `--stats`. The table is refreshed every `STATS_REFRESH_MS` milliseconds while the window
+    is open; operations run in the background are also listed with the time until their result was shown
+    ("(completed)").
+    """
+    statistics_window = tk.Toplevel(window)
+    statistics_window.title("Statistics")
+    table = tk.Label(statistics_window, font=("Courier", 10), justify=tk.LEFT, padx=10, pady=10)
+    table.pack()
+
+    def update():
+        if statistics_window.winfo_exists():
+            table.config(text=latency.format_summary())
+            window.after(STATS_REFRESH_MS, update)
+
+    update()
 
 
 def select_voice():
     """
     Selects the voice for pronunciation based on the chosen option.
 
-    Retrieves the selected voice option from the `voice_option` variable and sets the corresponding
-    voice in the text-to-speech engine (`engine`). If "M" is selected, the first/masculine voice in the available
-    voices list is used. If "F" is selected, the second/feminine voice is used.
+    Retrieves the selected voice option from the `voice_option` variable and passes the corresponding
+    voice to the text-to-speech worker (`speech_worker`). If "M" is selected, the first/masculine voice in the
+    available voices list is used. If "F" is selected, the second/feminine voice is used.
     """
     voice = voice_option.get()
     if voice == "M":
-        voices = engine.getProperty('voices')
-        engine.setProperty('voice', voices[0].id)
+        speech_worker.select_voice(0)
     elif voice == "F":
-        voices = engine.getProperty('voices')
-        engine.setProperty('voice', voices[1].id)
+        speech_worker.select_voice(1)
 
 
+@latency.timed
 def pronounce_word():
     """
     Pronounces the selected word using the pyttsx3 TTS engine.
 
     Retrieves the selected word from the `word_dropdown` variable and checks if it is a valid word.
-    If the word is valid, it is passed to the text-to-speech engine (`engine`) for pronunciation.
+    If the word is valid, it is queued on the text-to-speech worker (`speech_worker`), which pronounces it on its
+    own thread. A word that is still being pronounced is interrupted.
     """
     selected_word = word_dropdown.get().strip()
     if not selected_word or selected_word == "Select a word":
         messagebox.showerror("Invalid Word", "Please select a valid word.")
         return
 
-    engine.say(selected_word)
-    engine.runAndWait()
+    speech_worker.say(selected_word)
+    pronounce_button.config(text="Pronouncing...")
 
 
+def poll_speech():
+    """
+    Handles the pronunciations finished by the text-to-speech worker.
+
+    Runs every `SPEECH_POLL_MS` milliseconds on the Tk main loop. Once the latest request has finished, the
+    pronounce button is restored; if the engine failed, an error message is displayed.
+    """
+    for result in speech_worker.poll():
+        if result.generation == speech_worker.generation:
+            pronounce_button.config(text="Pronounce Word")
+            if result.error is not None:
+                messagebox.showerror("Pronunciation Failed", f"Could not pronounce the word: {result.error}")
+
+    window.after(SPEECH_POLL_MS, poll_speech)
+
+
+def poll_changes():
+    """
+    Picks up the changes made to the dictionary by other instances of the application.
+
+    Runs every `CHANGE_POLL_MS` milliseconds on the Tk main loop, unless another operation is in progress. The
+    check runs on the I/O worker; when nothing has changed, it costs a couple of file status checks, otherwise
+    only the rows the other instances have added are read. The completions are updated, and the definitions
+    shown in the listbox too if they belong to a word that changed. A failed check is retried the next time.
+    """
+    def changes_found(changed):
+        if changed is None or changed:
+            update_completions()
+            if changed is None or word_dropdown.get() in changed:
+                refresh_listbox()
+
+    window.after(CHANGE_POLL_MS, poll_changes)
+    if io_worker.idle():
+        io_worker.submit(dictionary.refresh, on_done=changes_found, on_error=lambda error: None)
+
+
+@latency.timed
 def add_word():
     """
     Adds a new word entry to the dictionary.
 
     This function retrieves the values entered in the word, part-of-speech, definition, synonyms, and antonyms
-    fields. It performs validation to ensure that all required fields (word, p-o-s, definition) are filled.
-    If the word entry is unique (not already existing in the dictionary), it appends the word and its details
-    to the CSV file. Finally, it displays a success message, refreshes the word dropdown and listbox,
-    and clears the input fields.
+    fields and passes them to the dictionary (`dictionary`), which ensures that all required fields
+    (word, p-o-s, definition) are filled and that the entry is unique before adding it to the dictionary file.
+    The entry is saved on the I/O worker; once it is saved, a success message is displayed, the word dropdown
+    and listbox are refreshed, and the input fields are cleared.
     """
-    word = word_entry.get().strip()
     pos = pos_dropdown.get()
-    definition = definition_entry.get().strip()
-    synonyms = synonyms_entry.get().strip()
-    antonyms = antonyms_entry.get().strip()
-
-    if word and definition and pos != "Select a part-of-speech":
-        with open('dictionary.csv', 'r') as f:
-            rdr = csv.reader(f, delimiter=';')
-            for row in rdr:
-                if row[0].strip() == word and row[1].strip() == pos and row[2].strip() == definition:
-                    messagebox.showwarning("Duplicate Entry", "The entry already exists.")
-                    return
-
-        with open('dictionary.csv', 'a', newline='') as f:
-            writer = csv.writer(f, delimiter=';')
-            writer.writerow([word, pos, definition, synonyms, antonyms])
+    if pos == "Select a part-of-speech":
+        pos = ""
+    entry = Entry(word_entry.get(), pos, definition_entry.get(), synonyms_entry.get(), antonyms_entry.get())
 
+    def added(result):
         messagebox.showinfo("Success", "Word added successfully.")
         refresh_dropdown()
         refresh_listbox()
         clear_fields()
-    else:
-        messagebox.showwarning("Missing Information", "Please enter a word, part-of-speech, and definition.")
+
+    start_job(lambda: dictionary.add(entry), added,
+              errors={MissingInformationError: "Missing Information", DuplicateEntryError: "Duplicate Entry"},
+              message="Saving...")
 
 
+@latency.timed
 def load_word():
     """
     Loads the details of a word from the dictionary file.
 
-    Retrieves a word form the dropdown and searches for its details in the dictionary file. If the word is found,
-    it retrieves the associated part-of-speech, definition, synonyms, and antonyms. The function then populates
-    the listbox with the retrieved information.
+    Retrieves a word form the dropdown and looks up its details in the dictionary. If the word is found,
+    the listbox (`results`) shows five numbered lines per definition: the record number, part-of-speech,
+    definition, synonyms, and antonyms. Lines are fetched from the dictionary only as they scroll into view.
     """
+    if dictionary is None:
+        return
     selected_word = word_dropdown.get()
-    listbox.delete(0, tk.END)
-    count = 1
 
-    with open('dictionary.csv', 'r') as f:
-        rdr = csv.reader(f, delimiter=';')
-        for row in rdr:
-            if row[0] == selected_word:
-                listbox.insert(tk.END, f"{count})")
-                listbox.insert(tk.END, "Part-of-speech: " + row[1])
-                listbox.insert(tk.END, "Definition: " + row[2])
-                listbox.insert(tk.END, "Synonyms: " + row[3])
-                listbox.insert(tk.END, "Antonyms: " + row[4])
-                count += 1
+    def fetch(line):
+        record_index = line // 5 + 1
+        if line % 5 == 0:
+            return f"{record_index})"
+        record = dictionary.entry(selected_word, record_index)
+        return LOADED_LABELS[line % 5] + record[line % 5] if record else ""
+
+    results.show(5 * dictionary.count(selected_word), fetch)
 
 
+@latency.timed
 def delete_record():
     """
     Deletes a word record from the dictionary file.
 
     Retrieves word, part-of-speech and definition from the entry box and deletes the corresponding word record
-    from the dictionary file. The function removes the record from the file, refreshes the UI listbox, and displays
-    a success message. It requires the user to load in the word instead of using the index as a security measure.
+    from the dictionary file. The deletion is saved on the I/O worker; once it is saved, the UI listbox is
+    refreshed and a success message is displayed. It requires the user to load in the word instead of using the
+    index as a security measure.
     """
     selected_word = word_entry.get().strip()
     selected_pos = pos_dropdown.get().strip()
     selected_definition = definition_entry.get().strip()
 
-    if not selected_word or not selected_pos or not selected_definition:
-        messagebox.showwarning("Incomplete Information", "Please provide the word, part of speech, and definition.")
-        return
-
-    with open('dictionary.csv', 'r') as f:
-        rdr = csv.reader(f, delimiter=';')
-        rows = list(rdr)
-
-    deleted = False
-    with open('dictionary.csv', 'w', newline='') as f:
-        writer = csv.writer(f, delimiter=';')
-        for row in rows:
-            word = row[0].strip()
-            pos = row[1].strip()
-            definition = row[2].strip()
-            if word == selected_word and pos == selected_pos and definition == selected_definition:
-                deleted = True
-                continue
-            writer.writerow(row)
-
-    if deleted:
+    def deleted(result):
         messagebox.showinfo("Success", "Record deleted successfully.")
         refresh_dropdown()
         refresh_listbox()
         clear_fields()
-    else:
-        messagebox.showwarning("No Matching Record", "No record found with the provided information.")
+
+    start_job(lambda: dictionary.delete(selected_word, selected_pos, selected_definition), deleted,
+              errors={MissingInformationError: "Incomplete Information", RecordNotFoundError: "No Matching Record"},
+              message="Saving...")
 
 
 def clear_fields():
@@ -152,86 +322,218 @@ def clear_fields():
     antonyms_entry.delete(0, tk.END)
 
 
+@latency.timed
 def refresh_dropdown():
     """
-    Refreshes the word dropdown with the updated list of words from the dictionary.
+    Refreshes the word search with the updated list of words from the dictionary.
 
-    Retrieves the list of words from the CSV file and populates the word dropdown (`word_dropdown`) with the
-    updated set of unique words. It also sets the default selected option to "Select a word".
+    Updates the completions shown for the current search text from the words of the dictionary. It also sets
+    the selected word (`word_dropdown`) back to "Select a word".
     """
     word_dropdown.set("Select a word")
-    word_menu['menu'].delete(0, 'end')
+    update_completions()
 
-    words_set = set()
-    with open('dictionary.csv', 'r') as f:
-        rdr = csv.reader(f, delimiter=';')
-        for row in rdr:
-            words_set.add(row[0])
 
-    for word in words_set:
-        word_menu['menu'].add_command(label=word, command=lambda value=word: word_dropdown.set(value))
+def schedule_completions(*args):
+    """
+    Schedules an update of the search completions after the user stops typing.
 
+    Called whenever the search text changes. Any update that is still pending is cancelled, so a burst of
+    keystrokes results in a single lookup `COMPLETION_DELAY_MS` milliseconds after the last one.
+    """
+    global pending_completion
+    if pending_completion is not None:
+        window.after_cancel(pending_completion)
+    pending_completion = window.after(COMPLETION_DELAY_MS, update_completions)
+
+
+def update_completions():
+    """
+    Fills the completion listbox with the words starting with the search text.
+
+    Looks up at most `COMPLETION_LIMIT` completions in the prefix index of the dictionary. Nothing is shown
+    while the search box is empty. If no word starts with the search text, the closest words are suggested
+    instead (see `show_suggestions`).
+    """
+    global pending_completion
+    pending_completion = None
+    completion_listbox.delete(0, tk.END)
+    suggestion_label.config(text="")
+
+    prefix = search_text.get().strip()
+    if prefix and dictionary is not None:
+        words = dictionary.complete(prefix, COMPLETION_LIMIT)
+        for word in words:
+            completion_listbox.insert(tk.END, word)
+        if not words:
+            show_suggestions(prefix)
+
+
+def show_suggestions(prefix):
+    """
+    Lists the words within two edits of a search text that no word starts with, under "Did you mean:".
+
+    The suggestions are looked up on the I/O worker, as building the spelling index the first time takes a while
+    on large dictionaries, without a busy indicator. A lookup still waiting when the search text changes again is
+    skipped, and suggestions are only shown while the search text is still the one they were looked up for.
+    """
+    global suggestion_prefix
+    suggestion_prefix = prefix
+
+    def suggest():
+        if prefix != suggestion_prefix:
+            return []
+        return dictionary.suggest(prefix)
+
+    def suggested(words):
+        if not words or prefix != search_text.get().strip() or completion_listbox.size():
+            return
+        suggestion_label.config(text="Did you mean:")
+        for word in words:
+            completion_listbox.insert(tk.END, word)
 
+    io_worker.submit(suggest, on_done=suggested, on_error=lambda error: None)
+
+
+def select_completion(event=None):
+    """
+    Selects the word clicked in the completion listbox.
+
+    Pressing Enter in the search box selects the first completion instead. If there is none, the closest words
+    are suggested in the completion listbox, to be clicked.
+    """
+    if dictionary is None:
+        return
+    if event is not None and event.widget is search_entry:
+        prefix = search_text.get().strip()
+        words = dictionary.complete(prefix, 1)
+        if prefix and not words and not completion_listbox.size():
+            show_suggestions(prefix)
+    else:
+        words = [completion_listbox.get(i) for i in completion_listbox.curselection()]
+
+    if words:
+        word_dropdown.set(words[0])
+
+
+@latency.timed
 def refresh_listbox():
     """
     Refreshes the word listbox with the updated list of words from the dictionary.
 
-    Retrieves the list of words from the CSV file and populates the word listbox
-    (`word_listbox`) with the updated list of words. It also configures the listbox to display the
-    word entries in a scrollable manner.
+    Retrieves the definitions of the selected word from the dictionary and shows them in the word listbox
+    (`results`), followed by a blank line each. Like in `load_word`, only the lines scrolled into view are
+    fetched and inserted.
     """
+    if dictionary is None:
+        return
     selected_word = word_dropdown.get()
-    listbox.delete(0, tk.END)
 
-    with open('dictionary.csv', 'r') as f:
-        rdr = csv.reader(f, delimiter=';')
-        for row in rdr:
-            if row[0] == selected_word:
-                listbox.insert(tk.END, "Part-of-Speech: " + row[1])
-                listbox.insert(tk.END, "Definition: " + row[2])
-                listbox.insert(tk.END, "Synonyms: " + row[3])
-                listbox.insert(tk.END, "Antonyms: " + row[4])
-                listbox.insert(tk.END, "")
+    def fetch(line):
+        record = dictionary.entry(selected_word, line // 5 + 1)
+        if line % 5 == 4 or not record:
+            return ""
+        return REFRESHED_LABELS[line % 5] + record[line % 5 + 1]
 
+    results.show(5 * dictionary.count(selected_word), fetch)
+
+
+def find_by_meaning():
+    """
+    Lists the words whose definition mentions the text of the meaning search box.
 
+    Looks up the best `MEANING_SEARCH_LIMIT` matches in the full-text index of the dictionary and shows one line
+    per matching definition in the listbox, best match first. If nothing matches, an information message is
+    displayed instead. The search runs on the I/O worker, as building the index the first time takes a while on
+    large dictionaries, and can be cancelled.
+    """
+    query = meaning_entry.get().strip()
+    if not query:
+        messagebox.showwarning("Missing Information", "Please enter words to look for in the definitions.")
+        return
+
+    def found(matches):
+        if not matches:
+            messagebox.showinfo("No Matches", "No definition mentions these words.")
+            return
+        results.show(len(matches),
+                     lambda line: f"{matches[line].word} ({matches[line].pos}): {matches[line].definition}")
+
+    start_job(lambda: dictionary.search(query, MEANING_SEARCH_LIMIT), found,
+              message="Searching the definitions...", cancellable=True)
+
+
+def show_related_words():
+    """
+    Shows the thesaurus links of the selected word in the listbox.
+
+    Lists the synonyms and antonyms the word's definitions give, the words that list it as a synonym or antonym,
+    and every word reachable through synonyms in at most `RELATED_WORDS_DEPTH` hops, in either direction. The
+    links are looked up on the I/O worker, as building the graph the first time takes a while on large
+    dictionaries, and the lookup can be cancelled.
+    """
+    selected_word = word_dropdown.get().strip()
+    if not selected_word or selected_word == "Select a word":
+        messagebox.showerror("Invalid Word", "Please select a valid word.")
+        return
+
+    def related_lines():
+        graph = dictionary.thesaurus()
+        lines = [
+            "Synonyms: " + ", ".join(graph.neighbours(selected_word, 'synonyms')),
+            "Antonyms: " + ", ".join(graph.neighbours(selected_word, 'antonyms')),
+            "Listed as synonym by: " + ", ".join(graph.reverse_neighbours(selected_word, 'synonyms')),
+            "Listed as antonym by: " + ", ".join(graph.reverse_neighbours(selected_word, 'antonyms')),
+            f"Related within {RELATED_WORDS_DEPTH} steps:",
+        ]
+        related = graph.expand(selected_word, RELATED_WORDS_DEPTH, include_reverse=True)
+        for word, hops in sorted(related.items(), key=lambda item: (item[1], item[0])):
+            lines.append(f"  {word} ({hops})")
+        return lines
+
+    start_job(related_lines, lambda lines: results.show(len(lines), lines.__getitem__),
+              message="Finding related words...", cancellable=True)
+
+
+@latency.timed
 def load_record_by_index():
     """
     Loads a word record from the dictionary based on the provided index.
 
-    Retrieves the word record at the specified index from the CSV file and updates the fields
+    Retrieves the word record at the specified index from the dictionary and updates the fields
     (word_entry, pos_dropdown, definition_entry, synonyms_entry, and antonyms_entry) with the loaded information.
     The record number can be found by examining the word values when loaded into the listbox.
     The first record has a value of 1, not 0.
-    If the index is out of range or the CSV file cannot be read, an error message is displayed.
+    If the index is out of range, an error message is displayed. If the word itself is unknown, the message
+    suggests the closest words in the dictionary, which are looked up on the I/O worker.
     If the index is valid, but the record is not found, the fields are cleared.
     """
     index = int(index_entry.get())
 
     word = word_dropdown.get().strip()
 
-    if not word:
+    if not word or word == "Select a word":
         messagebox.showerror("Empty Word", "Please enter a word.")
         return
+    if dictionary is None:
+        return
 
-    with open('dictionary.csv', 'r') as f:
-        rdr = csv.reader(f, delimiter=';')
-        count = 0
-
-        for row in rdr:
-            if row[0].strip() == word:
-                count += 1
-                if count == index:
-                    selected_record = row
-                    break
+    def not_found(suggestions):
+        message = "The word was not found in the dictionary."
+        if suggestions:
+            message += "\nDid you mean: " + ", ".join(suggestions) + "?"
+        messagebox.showerror("Word Not Found", message)
+
+    selected_record = dictionary.entry(word, index)
+    if selected_record is None:
+        if dictionary.count(word) == 0:
+            start_job(lambda: dictionary.suggest(word), not_found, message="Looking for similar words...",
+                      cancellable=True)
         else:
-            messagebox.showerror("Word Not Found", "The word was not found in the dictionary.")
-            return
+            not_found([])
+        return
 
-    word = selected_record[0].strip()
-    pos = selected_record[1].strip()
-    definition = selected_record[2].strip()
-    synonyms = selected_record[3].strip()
-    antonyms = selected_record[4].strip()
+    word, pos, definition, synonyms, antonyms = selected_record
 
     word_entry.delete(0, tk.END)
     word_entry.insert(0, word)
@@ -244,14 +546,16 @@ def load_record_by_index():
     antonyms_entry.insert(0, antonyms)
 
 
+@latency.timed
 def edit_entry():
     """
     Updates the details of a selected word in the dictionary.
 
     This function retrieves the selected word from the word listbox (`word_listbox`) and the updated details
     (part-of-speech, definition, synonyms, antonyms) entered in the update word form (`pos_entry`, `definition_entry`,
-    `synonyms_entry`, `antonyms_entry`). It modifies the corresponding entry in the CSV file with the updated details,
-    refreshes the word dropdown and listbox, and displays a success message.
+    `synonyms_entry`, `antonyms_entry`). It modifies the corresponding entry in the dictionary, which passes
+    the updated details on to the dictionary file. The change is saved on the I/O worker; once it is saved, the
+    word dropdown and listbox are refreshed and a success message is displayed.
     """
     index = int(index_entry.get())
 
@@ -261,37 +565,21 @@ def edit_entry():
         messagebox.showerror("Empty Word", "Please enter a word.")
         return
 
-    with open('dictionary.csv', 'r') as f:
-        rdr = csv.reader(f, delimiter=';')
-        count = 0
-        rows = list(rdr)
-
-    edited = False
-    with open('dictionary.csv', 'w', newline='') as f:
-        writer = csv.writer(f, delimiter=';')
-        for row in rows:
-            if row[0].strip() == word:
-                count += 1
-                if count == index:
-                    edited = True
-                    writer.writerow([word_entry.get(),
-                                     pos_dropdown.get(), definition_entry.get(),
-                                     synonyms_entry.get(), antonyms_entry.get()])
-                else:
-                    writer.writerow(row)
-            else:
-                writer.writerow(row)
-
-    if edited:
+    entry = Entry(word_entry.get(), pos_dropdown.get(), definition_entry.get(), synonyms_entry.get(),
+                  antonyms_entry.get())
+
+    def edited(result):
         messagebox.showinfo("Success", "Record edited successfully.")
         refresh_dropdown()
         refresh_listbox()
-    else:
-        messagebox.showwarning("No Matching Record", "No record found with the provided information.")
+
+    start_job(lambda: dictionary.edit(word, index, entry), edited,
+              errors={RecordNotFoundError: "No Matching Record"}, message="Saving...")
 
 
 window = tk.Tk()
-window.title("Dictionary")
+window.title("Dictionary (read-only)" if READ_ONLY else "Dictionary")
+window.protocol("WM_DELETE_WINDOW", close_window)
 
 word_label = tk.Label(window, text="Word:")
 pos_label = tk.Label(window, text="Part-of-Speech:")
@@ -311,8 +599,17 @@ index_label = tk.Label(window, text="Record Index \n (in listbox):")
 index_entry = tk.Entry(window)
 index_button = tk.Button(window, text="Load Record", command=load_record_by_index, bg="#d0d0d0")
 
+meaning_label = tk.Label(window, text="Meaning:")
+meaning_entry = tk.Entry(window)
+meaning_button = tk.Button(window, text="Find by Meaning", command=find_by_meaning, bg="#d0d0d0")
+
 word_dropdown = tk.StringVar()
-word_menu = tk.OptionMenu(window, word_dropdown, "Select a word")
+search_frame = tk.Frame(window)
+search_text = tk.StringVar()
+search_entry = tk.Entry(search_frame, textvariable=search_text)
+suggestion_label = tk.Label(search_frame, text="")
+completion_listbox = tk.Listbox(search_frame, height=5, exportselection=False)
+selected_word_label = tk.Label(search_frame, textvariable=word_dropdown)
 
 scrollbar = Scrollbar(window)
 
@@ -321,9 +618,19 @@ listbox = tk.Listbox(window)
 add_button = tk.Button(window, text="Add Word", command=add_word, bg="#2a4c29", fg="#f3f7d6")
 edit_button = tk.Button(window, text="Edit Entry", command=edit_entry, bg="#f2f7ca")
 load_button = tk.Button(window, text="Load Into Listbox", command=load_word, bg="#d0d0d0")
+related_button = tk.Button(window, text="Related Words", command=show_related_words, bg="#d0d0d0")
 delete_button = tk.Button(window, text="Delete Definition", command=delete_record, bg="#731d1d", fg="#f3f7d6")
 pronounce_button = tk.Button(window, text="Pronounce Word", command=pronounce_word, bg="#b2c9f2")
 
+status_label = tk.Label(window, text="")
+cancel_button = tk.Button(window, text="Cancel", command=cancel_job, state=tk.DISABLED, bg="#d0d0d0")
+
+statistics_button = tk.Button(window, text="Statistics", command=show_statistics, bg="#d0d0d0")
+
+if READ_ONLY:
+    for button in (add_button, edit_button, delete_button):
+        button.config(state=tk.DISABLED)
+
 voice_option = tk.StringVar()
 male_radio = tk.Radiobutton(window, text="M", variable=voice_option, value="M", command=select_voice)
 female_radio = tk.Radiobutton(window, text="F", variable=voice_option, value="F", command=select_voice)
@@ -337,8 +644,11 @@ word_entry.config(width=20)
 definition_entry.config(width=20)
 synonyms_entry.config(width=20)
 antonyms_entry.config(width=20)
+meaning_entry.config(width=20)
 
 listbox.config(width=40)
+search_entry.config(width=30)
+completion_listbox.config(width=30)
 index_entry.config(width=5)
 
 word_label.grid(row=0, column=0, sticky=tk.E)
@@ -351,7 +661,11 @@ synonyms_label.grid(row=3, column=0, sticky=tk.E)
 synonyms_entry.grid(row=3, column=1, sticky=tk.W)
 antonyms_label.grid(row=4, column=0, sticky=tk.E)
 antonyms_entry.grid(row=4, column=1, sticky=tk.W)
-word_menu.grid(row=1, column=2)
+search_frame.grid(row=1, column=2)
+search_entry.pack()
+suggestion_label.pack()
+completion_listbox.pack()
+selected_word_label.pack()
 load_button.grid(row=2, column=2, pady=5)
 pronounce_button.grid(row=0, column=2, sticky=tk.N, pady=5)
 listbox.grid(row=3, column=2, rowspan=4, padx=10, pady=10)
@@ -359,15 +673,37 @@ scrollbar.grid(row=3, column=3, rowspan=4, sticky=tk.N + tk.S)
 add_button.grid(row=5, column=1, sticky=tk.N + tk.W)
 edit_button.grid(row=6, column=1, sticky=tk.N + tk.W)
 delete_button.grid(row=7, column=1, sticky=tk.N + tk.W)
+meaning_label.grid(row=8, column=0, sticky=tk.E)
+meaning_entry.grid(row=8, column=1, sticky=tk.W)
+meaning_button.grid(row=9, column=1, sticky=tk.N + tk.W)
+related_button.grid(row=7, column=2, pady=5)
 index_label.grid(row=8, column=2, sticky=tk.W)
 index_entry.grid(row=8, column=2)
 index_button.grid(row=9, column=2, pady=5)
+status_label.grid(row=10, column=0, columnspan=2, sticky=tk.W, padx=5)
+cancel_button.grid(row=10, column=2, pady=5)
+if STATS:
+    statistics_button.grid(row=11, column=2, pady=5)
 male_radio.grid(row=0, column=4, sticky=tk.W)
 female_radio.grid(row=1, column=4, sticky=tk.W)
 
-listbox.config(yscrollcommand=scrollbar.set)
-scrollbar.config(command=listbox.yview)
+results = VirtualListbox(listbox, scrollbar)
+
+search_text.trace_add('write', schedule_completions)
+search_entry.bind('<Return>', select_completion)
+completion_listbox.bind('<<ListboxSelect>>', select_completion)
+meaning_entry.bind('<Return>', lambda event: find_by_meaning())
 
 refresh_dropdown()
+load_dictionary()
+window.after_idle(speech_worker.warm)
+poll_speech()
+poll_io()
 
 window.mainloop()
+speech_worker.stop()
+if dictionary is not None:
+    # The dictionary was opened on the I/O worker, and an SQLite connection can only be closed by its own thread.
+    io_worker.submit(dictionary.close)
+io_worker.stop()
+latency.dump(STATS_PATH)
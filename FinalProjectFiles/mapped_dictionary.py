@@ -0,0 +1,306 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from definition_index import DefinitionIndex
+from dictionary import ReadOnlyError
+from dictionary_store import DictionaryStore
+from entry import Entry
+from spelling_index import SpellingIndex
+from storage import open_backend
+from thesaurus import ThesaurusGraph
+
+MAGIC = b'DICTMAP1'
+HEADER = struct.Struct('=8s8sQQQqQq')
+BYTE_ORDER = sys.byteorder.encode().ljust(8, b'\0')
+FIELD_SEPARATOR = b'\x1f'
+
+
+def source_signature(path):
+    """
+    Returns the (size, modification time) of a dictionary file and of its journal, with zeros for missing files.
+    """
+    signature = []
+    for source in (path, path + '.journal'):
+        try:
+            stat = os.stat(source)
+            signature += [stat.st_size, stat.st_mtime_ns]
+        except FileNotFoundError:
+            signature += [0, 0]
+    return tuple(signature)
+
+
+def build_lookup_file(path, lookup_path):
+    """
+    Writes the sorted, offset-indexed lookup file of a dictionary.
+
+    The file starts with a header recording the number of words and records and the signature of the dictionary
+    it was built from, followed by three arrays of 64-bit integers: the offset of every headword in the word
+    section, the index of the first record of every headword, and the offset of every record in the record
+    section. The word section holds the UTF-8 headwords in byte order, which is also code point order; the record
+    section holds the records grouped by headword in the same order, each record keeping the file order of its
+    word's definitions and storing its five fields separated by a unit separator.
+
+    The dictionary is loaded in full once to build the file, journal included, without changing it: its lock,
+    cache and compaction are left alone. It is read again if it changed while it was read, so the recorded
+    signature always matches the records. The file is written to a temporary file and moved into place, so readers
+    never see a partial file.
+    """
+    while True:
+        signature = source_signature(path)
+        store = DictionaryStore(open_backend(path), read_only=True)
+        if source_signature(path) == signature:
+            break
+        store.close()
+
+    try:
+        words = sorted((word.encode(), word) for word in store.words() if store.count(word))
+        word_offsets = array('Q', [0])
+        word_records = array('Q', [0])
+        for encoded, word in words:
+            word_offsets.append(word_offsets[-1] + len(encoded))
+            word_records.append(word_records[-1] + store.count(word))
+        word_section = b''.join(encoded for encoded, word in words)
+        word_section += b'\0' * (-len(word_section) % 8)
+        record_count = word_records[-1]
+
+        arrays_start = HEADER.size + (-HEADER.size % 8)
+        records_start = arrays_start + 8 * (2 * len(words) + record_count + 3) + len(word_section)
+        record_offsets = array('Q', [0])
+        tmp_path = lookup_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.seek(records_start)
+            for encoded, word in words:
+                for record in store.definitions(word):
+                    data = FIELD_SEPARATOR.join(field.encode().replace(FIELD_SEPARATOR, b' ') for field in record)
+                    f.write(data)
+                    record_offsets.append(record_offsets[-1] + len(data))
+
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, BYTE_ORDER, len(words), record_count, *signature))
+            f.seek(arrays_start)
+            f.write(word_offsets.tobytes())
+            f.write(word_records.tobytes())
+            f.write(record_offsets.tobytes())
+            f.write(word_section)
+        os.replace(tmp_path, lookup_path)
+    finally:
+        store.close()
+
+
+class MappedDictionary:
+    """
+    Read-only dictionary answering lookups straight from a memory-mapped lookup file.
+
+    Meant for very large reference dictionaries that are only ever looked up. The records are not loaded into
+    Python objects: the lookup file built from the dictionary (see `build_lookup_file`) is mapped into memory, a
+    headword is found by binary search over the sorted headwords in the mapped buffer, and only the records of the
+    words actually shown are decoded. Resident memory stays small, and the operating system shares the pages of
+    the file between every process reading it. The lookup file sits next to the dictionary
+    (`dictionary.csv.lookup`) and is rebuilt when it is missing or older than the dictionary or its journal.
+
+    Offers the read methods of `Dictionary`; `add`, `edit` and `delete` raise ReadOnlyError. The spelling,
+    full-text and thesaurus indexes are still built in memory, from every record, the first time they are needed.
+
+    The mapped file never changes, so the read methods take no lock and can run from any thread at any time. Only
+    the lazy index builds hold `build_lock`, so a build never runs twice, while lookups and completions go on
+    alongside it; a built index is never changed either. `close` waits for a running build, but the caller must
+    make sure no other thread is still reading.
+    """
+
+    def __init__(self, path):
+        self.build_lock = threading.Lock()
+        self.path = path
+        self.lookup_path = path + '.lookup'
+        self.spelling_index = None
+        self.definition_index = None
+        self.thesaurus_graph = None
+
+        if not self._is_current():
+            build_lookup_file(path, self.lookup_path)
+        with open(self.lookup_path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, byte_order, self.word_count, self.record_count, *signature = HEADER.unpack_from(self.map)
+        self.view = view = memoryview(self.map)
+        start = HEADER.size + (-HEADER.size % 8)
+        self.word_offsets = view[start:start + 8 * (self.word_count + 1)].cast('Q')
+        start += 8 * (self.word_count + 1)
+        self.word_records = view[start:start + 8 * (self.word_count + 1)].cast('Q')
+        start += 8 * (self.word_count + 1)
+        self.record_offsets = view[start:start + 8 * (self.record_count + 1)].cast('Q')
+        self.words_start = start + 8 * (self.record_count + 1)
+        self.records_start = self.words_start + self.word_offsets[-1] + (-self.word_offsets[-1] % 8)
+
+    def words(self):
+        """
+        Yields the unique words in the dictionary, in alphabetical order.
+        """
+        for word_id in range(self.word_count):
+            yield self._word(word_id).decode()
+
+    def complete(self, prefix, limit=50):
+        """
+        Returns up to `limit` words starting with the given prefix, in alphabetical order.
+        """
+        prefix = prefix.encode()
+        start = self._bisect(prefix)
+        completions = []
+        for word_id in range(start, min(self.word_count, start + limit)):
+            word = self._word(word_id)
+            if not word.startswith(prefix):
+                break
+            completions.append(word.decode())
+        return completions
+
+    def suggest(self, word, limit=5):
+        """
+        Returns up to `limit` words within two edits of a possibly misspelled word, closest first.
+
+        The spelling index is built in memory from every word on the first call.
+        """
+        if self.spelling_index is None:
+            with self.build_lock:
+                if self.spelling_index is None:
+                    self.spelling_index = SpellingIndex(self.words())
+        return self.spelling_index.suggest(word, limit)
+
+    def search(self, query, limit=20):
+        """
+        Returns up to `limit` entries whose definition best matches a query, ranked with BM25.
+
+        The full-text index is built in memory from every record on the first call.
+        """
+        if self.definition_index is None:
+            with self.build_lock:
+                if self.definition_index is None:
+                    self.definition_index = DefinitionIndex(self._records())
+        return [self._record(record_id) for record_id, score in self.definition_index.search(query, limit)]
+
+    def thesaurus(self):
+        """
+        Returns the synonym/antonym graph of the dictionary (see `thesaurus.py`), built on the first call.
+        """
+        if self.thesaurus_graph is None:
+            with self.build_lock:
+                if self.thesaurus_graph is None:
+                    self.thesaurus_graph = ThesaurusGraph(self._records())
+        return self.thesaurus_graph
+
+    def lookup(self, word):
+        """
+        Returns the entries of a word in file order, or an empty list if the word is unknown.
+        """
+        first, end = self._record_range(word)
+        return [self._record(record_id) for record_id in range(first, end)]
+
+    def count(self, word):
+        """
+        Returns the number of entries of a word.
+        """
+        first, end = self._record_range(word)
+        return end - first
+
+    def entry(self, word, index):
+        """
+        Returns the entry at the given 1-based index among the definitions of a word.
+
+        Returns None if the word is unknown or the index is out of range.
+        """
+        first, end = self._record_range(word)
+        if index < 1 or index > end - first:
+            return None
+        return self._record(first + index - 1)
+
+    def add(self, entry):
+        """
+        Raises ReadOnlyError: a mapped dictionary cannot be changed.
+        """
+        raise ReadOnlyError("The dictionary is open read-only.")
+
+    def edit(self, word, index, entry):
+        """
+        Raises ReadOnlyError: a mapped dictionary cannot be changed.
+        """
+        raise ReadOnlyError("The dictionary is open read-only.")
+
+    def delete(self, word, pos, definition):
+        """
+        Raises ReadOnlyError: a mapped dictionary cannot be changed.
+        """
+        raise ReadOnlyError("The dictionary is open read-only.")
+
+    def refresh(self):
+        """
+        Returns an empty set: the lookup file is a fixed snapshot of the dictionary.
+        """
+        return set()
+
+    def flush(self):
+        """
+        Does nothing: a mapped dictionary has no changes to write.
+        """
+
+    def raise_write_error(self):
+        """
+        Does nothing: a mapped dictionary never writes.
+        """
+
+    def close(self):
+        """
+        Unmaps the lookup file, once any index build has finished.
+        """
+        with self.build_lock:
+            for view in (self.word_offsets, self.word_records, self.record_offsets, self.view):
+                view.release()
+            self.map.close()
+
+    def _is_current(self):
+        try:
+            with open(self.lookup_path, 'rb') as f:
+                header = HEADER.unpack(f.read(HEADER.size))
+        except (OSError, struct.error):
+            return False
+        return header[:2] == (MAGIC, BYTE_ORDER) and tuple(header[4:]) == source_signature(self.path)
+
+    def _word(self, word_id):
+        start = self.words_start
+        return self.map[start + self.word_offsets[word_id]:start + self.word_offsets[word_id + 1]]
+
+    def _bisect(self, word):
+        low, high = 0, self.word_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._word(middle) < word:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _record_range(self, word):
+        encoded = word.encode()
+        word_id = self._bisect(encoded)
+        if word_id == self.word_count or self._word(word_id) != encoded:
+            return 0, 0
+        return self.word_records[word_id], self.word_records[word_id + 1]
+
+    def _record(self, record_id):
+        start = self.records_start
+        data = self.map[start + self.record_offsets[record_id]:start + self.record_offsets[record_id + 1]]
+        return Entry(*data.decode().split(FIELD_SEPARATOR.decode()))
+
+    def _records(self):
+        for record_id in range(self.record_count):
+            yield record_id, self._record(record_id)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the memory-mapped lookup file used to open a dictionary "
+                                                 "read-only.")
+    parser.add_argument('dictionary')
+    args = parser.parse_args()
+    build_lookup_file(args.dictionary, args.dictionary + '.lookup')
+    print(f"Wrote {args.dictionary}.lookup")
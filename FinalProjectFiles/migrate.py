@@ -0,0 +1,29 @@
+import sys
+from dictionary_store import DictionaryStore
+from storage import CsvBackend, SqliteBackend
+
+
+def migrate_csv_to_sqlite(csv_path, db_path):
+    """
+    Copies every record of a semicolon-delimited dictionary file into an SQLite database.
+
+    The CSV file is loaded through the dictionary store, so pending journal operations are applied before the
+    records are copied. All records are inserted in a single transaction. Returns the number of records copied.
+    """
+    source = DictionaryStore(CsvBackend(csv_path))
+    target = SqliteBackend(db_path)
+    try:
+        target.add_many(source.records.values())
+    finally:
+        target.close()
+        source.close()
+    return len(source.records)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage: python migrate.py dictionary.csv dictionary.db")
+        sys.exit(1)
+
+    count = migrate_csv_to_sqlite(sys.argv[1], sys.argv[2])
+    print(f"Copied {count} records into {sys.argv[2]}.")
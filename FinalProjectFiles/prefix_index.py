@@ -0,0 +1,74 @@
+from bisect import bisect_left
+
+
+class PrefixIndex:
+    """
+    Sorted array of headwords answering prefix completion queries.
+
+    Words sharing a prefix are contiguous in sorted order, so the completions of a prefix are found with a single
+    binary search for the first candidate followed by a short forward scan. A query costs O(log n + limit)
+    regardless of the size of the dictionary.
+
+    Every headword carries a reference count of the records defining it, and the index follows the dictionary
+    store as an observer: a record of a new word inserts one item at its sorted position, removing the last record
+    of a word removes one item, and any other change only updates a count. The array is never rebuilt.
+    """
+
+    def __init__(self, counts=None):
+        self.counts = dict(counts or {})
+        self.words = sorted(self.counts)
+
+    def record_added(self, record_id, record):
+        """
+        Counts one more record of a word, inserting the word if it is new.
+        """
+        self.add(record.word)
+
+    def record_removed(self, record_id, record):
+        """
+        Counts one record less of a word, removing the word with its last record.
+        """
+        self.remove(record.word)
+
+    def add(self, word):
+        """
+        Counts one more record of a word. Returns True if the word was not indexed before.
+        """
+        count = self.counts.get(word, 0)
+        self.counts[word] = count + 1
+        if count:
+            return False
+        self.words.insert(bisect_left(self.words, word), word)
+        return True
+
+    def remove(self, word):
+        """
+        Counts one record less of a word. Returns True if that was the last one and the word was removed.
+        """
+        count = self.counts.get(word, 0)
+        if count > 1:
+            self.counts[word] = count - 1
+            return False
+        if not count:
+            return False
+        del self.counts[word]
+        del self.words[bisect_left(self.words, word)]
+        return True
+
+    def complete(self, prefix, limit=50):
+        """
+        Returns up to `limit` headwords starting with the given prefix, in alphabetical order.
+        """
+        start = bisect_left(self.words, prefix)
+        completions = []
+        for word in self.words[start:start + limit]:
+            if not word.startswith(prefix):
+                break
+            completions.append(word)
+        return completions
+
+    def __contains__(self, word):
+        return word in self.counts
+
+    def __len__(self):
+        return len(self.words)
@@ -0,0 +1,197 @@
+import queue
+import sys
+import threading
+from audio_cache import AudioCache, find_player, play_file
+
+
+class SpeechResult:
+    """
+    Outcome of one pronunciation request, reported back to the GUI thread.
+
+    `generation` identifies the request; `error` holds the exception raised by the engine, or None on success.
+    """
+
+    def __init__(self, generation, word, error=None):
+        self.generation = generation
+        self.word = word
+        self.error = error
+
+
+class SpeechWorker:
+    """
+    Background thread owning the pyttsx3 text-to-speech engine.
+
+    Nothing is loaded when the worker is created: the thread is started, and pyttsx3 imported and initialised,
+    on the first request or when `warm` is called, so the speech driver never delays the first window. The list
+    of voices is read once, when the engine is created.
+
+    When a cache directory is given and an audio player is available, each word is rendered once with
+    `save_to_file` into an `AudioCache` in that directory, and later requests for the same word and voice settings
+    replay the cached clip. The cache is opened by the worker thread too, as it creates the directory and scans
+    its clips; if it cannot be opened, words are spoken directly.
+
+    Pronunciation requests are put on a bounded queue and spoken by the worker, so the Tk main loop never waits
+    for audio. Every request gets an increasing generation number. Submitting a new request drops the requests
+    still waiting in the queue and interrupts the word being spoken, so only the most recent click is heard.
+    Finished requests are put on the `results` queue, which the GUI drains with `poll` from a `window.after`
+    callback. If the engine cannot be loaded, every request is answered with the error instead.
+    """
+
+    def __init__(self, cache_directory=None, maxsize=4):
+        self.cache_directory = cache_directory
+        self.cache = None
+        self.requests = queue.Queue(maxsize)
+        self.results = queue.Queue()
+        self.generation = 0
+        self.voice_index = 0
+        self.voices = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def warm(self):
+        """
+        Starts the worker thread, which initialises the engine in the background. Does nothing if it is running.
+        """
+        if self._thread.ident is None:
+            self._thread.start()
+
+    def say(self, word):
+        """
+        Queues a word for pronunciation, cancelling any older request. Returns the generation of the request.
+        """
+        self.warm()
+        self.generation += 1
+        self._drain()
+        self.requests.put((self.generation, word))
+        return self.generation
+
+    def select_voice(self, index):
+        """
+        Sets the index of the voice used for the following requests.
+        """
+        self.voice_index = index
+
+    def poll(self):
+        """
+        Returns the results reported by the worker since the last call, without blocking.
+        """
+        results = []
+        while True:
+            try:
+                results.append(self.results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def stop(self):
+        """
+        Asks the worker thread to exit once the current word has been spoken.
+        """
+        if self._thread.ident is None:
+            return
+        self.generation += 1
+        self._drain()
+        self.requests.put(None)
+
+    def _drain(self):
+        while True:
+            try:
+                self.requests.get_nowait()
+            except queue.Empty:
+                return
+
+    def _run(self):
+        def interrupt_if_stale(name, location, length):
+            if name is not None and name != self.generation:
+                engine.stop()
+
+        try:
+            import pyttsx3
+
+            engine = pyttsx3.init()
+            self.voices = engine.getProperty('voices')
+            player = find_player() if self.cache_directory is not None else None
+            if player is not None:
+                try:
+                    self.cache = AudioCache(self.cache_directory)
+                except OSError:
+                    player = None
+            engine.connect('started-word', interrupt_if_stale)
+            setup_error = None
+        except Exception as e:
+            setup_error = e
+
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+
+            generation, word = request
+            if generation != self.generation:
+                continue
+            if setup_error is not None:
+                self.results.put(SpeechResult(generation, word, setup_error))
+                continue
+
+            try:
+                engine.setProperty('voice', self.voices[self.voice_index].id)
+                if player is not None:
+                    path = render(engine, self.cache, [word])[0]
+                    play_file(player, path, lambda: generation != self.generation)
+                else:
+                    engine.say(word, name=generation)
+                    engine.runAndWait()
+                self.results.put(SpeechResult(generation, word))
+            except Exception as e:
+                self.results.put(SpeechResult(generation, word, e))
+
+
+def render(engine, cache, words):
+    """
+    Returns the cache paths of the clips of the given words, rendering the missing ones in a single engine run.
+
+    The clips are rendered with the current voice, rate and volume of the engine.
+    """
+    voice_id = engine.getProperty('voice')
+    rate = engine.getProperty('rate')
+    volume = engine.getProperty('volume')
+
+    paths = [cache.path_for(word, voice_id, rate, volume) for word in words]
+    missing = [(word, path) for word, path in zip(words, paths) if not cache.get(path)]
+    if missing:
+        for word, path in missing:
+            engine.save_to_file(word, path + '.tmp')
+        engine.runAndWait()
+        for word, path in missing:
+            cache.put(path + '.tmp', path)
+    return paths
+
+
+def precache(dictionary_path, cache, batch_size=100):
+    """
+    Renders the clips of every word of a dictionary with the masculine and feminine voices.
+
+    Meant to be run offline, for example overnight, so that pronunciations are served from the cache from the
+    first click. Words are rendered in batches of `batch_size` per engine run. Returns the number of words.
+    """
+    import pyttsx3
+    from dictionary_store import DictionaryStore
+    from storage import open_backend
+
+    store = DictionaryStore(open_backend(dictionary_path))
+    words = sorted(store.words())
+    store.close()
+
+    engine = pyttsx3.init()
+    for voice in engine.getProperty('voices')[:2]:
+        engine.setProperty('voice', voice.id)
+        for start in range(0, len(words), batch_size):
+            render(engine, cache, words[start:start + batch_size])
+    return len(words)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage: python speech.py dictionary.csv audio_cache")
+        sys.exit(1)
+
+    count = precache(sys.argv[1], AudioCache(sys.argv[2]))
+    print(f"Cached the pronunciations of {count} words in {sys.argv[2]}.")
@@ -0,0 +1,102 @@
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+
+
+class SpellingIndex:
+    """
+    SymSpell-style deletion index answering "did you mean" queries within a small edit distance.
+
+    Every word is filed under all the strings obtained by deleting up to `max_distance` characters from its first
+    `prefix_length` characters. Two words within edit distance `max_distance` of each other always share one of
+    those strings, so a query only generates the deletions of the misspelled word, collects the words filed under
+    them and verifies each candidate with a bounded Levenshtein distance. Only the prefix is indexed to keep the
+    number of deletions per word small; the verification runs on the full words. Words can be added and removed
+    one at a time.
+    """
+
+    def __init__(self, words=(), max_distance=MAX_DISTANCE, prefix_length=PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.buckets = {}
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        """
+        Adds a word to the index.
+        """
+        buckets = self.buckets
+        for key in deletions(word[:self.prefix_length], self.max_distance):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = word
+            elif isinstance(bucket, str):
+                if bucket != word:
+                    buckets[key] = {bucket, word}
+            else:
+                bucket.add(word)
+
+    def remove(self, word):
+        """
+        Removes a word from the index.
+        """
+        for key in deletions(word[:self.prefix_length], self.max_distance):
+            bucket = self.buckets.get(key)
+            if bucket == word:
+                del self.buckets[key]
+            elif isinstance(bucket, set):
+                bucket.discard(word)
+                if len(bucket) == 1:
+                    self.buckets[key] = bucket.pop()
+
+    def suggest(self, term, limit=5):
+        """
+        Returns up to `limit` indexed words within `max_distance` edits of a term, closest first.
+
+        Words at the same distance are returned in alphabetical order.
+        """
+        candidates = set()
+        for key in deletions(term[:self.prefix_length], self.max_distance):
+            bucket = self.buckets.get(key)
+            if isinstance(bucket, str):
+                candidates.add(bucket)
+            elif bucket is not None:
+                candidates.update(bucket)
+
+        matches = []
+        for word in candidates:
+            if abs(len(word) - len(term)) > self.max_distance:
+                continue
+            distance = levenshtein(term, word, self.max_distance)
+            if distance <= self.max_distance:
+                matches.append((distance, word))
+
+        matches.sort()
+        return [word for distance, word in matches[:limit]]
+
+
+def deletions(word, max_distance):
+    """
+    Returns the set of strings obtained by deleting up to `max_distance` characters from a word, including itself.
+    """
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+        results |= frontier
+    return results
+
+
+def levenshtein(a, b, max_distance):
+    """
+    Returns the Levenshtein distance between two strings, or `max_distance + 1` once it is known to be larger.
+    """
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
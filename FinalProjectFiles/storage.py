@@ -0,0 +1,864 @@
+import contextlib
+import csv
+import gc
+import hashlib
+import io
+import os
+import pickle
+import shutil
+import sqlite3
+import threading
+from definition_index import tokenize
+from entry import Entry, normalize_row
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+JOURNAL_COMPACT_THRESHOLD = 1024 * 1024
+FLUSH_INTERVAL = 0.5
+FLUSH_OPERATIONS = 64
+CACHE_VERSION = 3
+DIGEST_SAMPLE_SIZE = 64 * 1024
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+CHANGE_LOG_ROWS = 10000
+
+
+def open_backend(path):
+    """
+    Opens the storage backend matching the extension of a dictionary path.
+
+    Files ending in .db, .sqlite or .sqlite3 are opened with the SQLite backend. Anything else is treated as a
+    semicolon-delimited CSV file, which is the default format of the application.
+    """
+    if path.lower().endswith(SQLITE_EXTENSIONS):
+        return SqliteBackend(path)
+    return CsvBackend(path)
+
+
+class CsvBackend:
+    """
+    Storage backend for the semicolon-delimited dictionary file.
+
+    Changes are not written into the dictionary file itself. Each add, edit and delete is appended as one small
+    row to a journal file next to it (`dictionary.csv.journal`), which the dictionary store replays on top of the
+    file at load time. Once the journal grows past `compact_threshold` bytes, it is folded into a new snapshot of
+    the dictionary file by a background thread.
+
+    Several instances of the application can share a dictionary. Journal appends, loads and the steps of a
+    compaction hold an advisory lock on `dictionary.csv.lock`, and every write is flushed to disk before the lock
+    is released. An instance only compacts while the journal holds nothing but its own changes, so it never
+    writes a snapshot missing rows that another instance journaled after it loaded. `changes()` picks up what the
+    other instances have written by reading only the end of the journal that this instance has not seen yet.
+
+    Journal rows are written behind: each operation is buffered in memory and returns at once, and the buffer is
+    appended to the journal with a single write and fsync (a group commit) `flush_interval` seconds after the
+    first buffered operation, as soon as `flush_operations` operations are waiting, before a compaction and when
+    the backend is closed. Flushes run on a timer thread, so journaling an operation never waits for the disk. A
+    crash can lose at most the last `flush_interval` seconds of changes. When a flush fails, the operations stay
+    buffered, the flush is retried every `flush_interval` seconds until it succeeds, and the error is kept for
+    `take_write_error`.
+
+    Parsing a large dictionary file takes seconds, so the parsed records are also kept in a binary cache next to
+    it (`dictionary.csv.cache`). The cache records the size, modification time and a content digest of the file it
+    was built from, and is only used while the file still matches them; the journal is replayed on top of it as
+    usual. A cache that is stale, unreadable or from another version of the application is simply rebuilt.
+    """
+
+    def __init__(self, path, compact_threshold=JOURNAL_COMPACT_THRESHOLD, flush_interval=FLUSH_INTERVAL,
+                 flush_operations=FLUSH_OPERATIONS):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.lock_path = path + '.lock'
+        self.cache_path = path + '.cache'
+        self.compact_threshold = compact_threshold
+        self.flush_interval = flush_interval
+        self.flush_operations = flush_operations
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_timer = None
+        self._write_error = None
+        self._journal_size = 0
+        self._journal_id = None
+        self._snapshot_signature = None
+        self._foreign_writes = False
+        self._unread = []
+        self._compaction = None
+
+    def rows(self):
+        """
+        Yields the normalized records stored in the dictionary file.
+        """
+        self._snapshot_signature = file_signature(self.path)
+        for row in read_rows(self.path):
+            yield normalize_row(row)
+
+    def read_cache(self):
+        """
+        Returns the state saved by `write_cache` if it was built from the current dictionary file, else None.
+
+        When it returns a state, the dictionary file counts as read, as after `rows()`. Call it with the lock held.
+        """
+        try:
+            with open(self.cache_path, 'rb') as f:
+                header = pickle.load(f)
+                if header != (CACHE_VERSION, cache_signature(self.path)):
+                    return None
+                gc.disable()  # loading creates many objects, none of them cyclic
+                try:
+                    state = pickle.load(f)
+                finally:
+                    gc.enable()
+        except Exception:
+            return None
+
+        self._snapshot_signature = file_signature(self.path)
+        return state
+
+    def write_cache(self, state):
+        """
+        Saves a picklable state built from the dictionary file just read, to be returned by `read_cache`.
+
+        Call it with the lock held, before any journaled operation has been applied to the state. The cache is
+        only an optimization, so failing to write it is not an error.
+        """
+        tmp_path = self.cache_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((CACHE_VERSION, cache_signature(self.path)), f, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(state, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except (OSError, pickle.PicklingError):
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+    def operations(self):
+        """
+        Yields the journaled operations that still have to be replayed on top of the dictionary file.
+
+        A journal left behind by an interrupted compaction is yielded before the current one, unless the snapshot
+        it was folded into has already replaced the dictionary file. Reading the whole journal brings the caller up
+        to date with the changes of other instances. A last row cut short by a crash is not a change: it is left
+        out, and cut off the journal before the next append.
+        """
+        yield from self._rotated_rows()
+        end = complete_size(self.journal_path)
+        yield from read_rows(self.journal_path, end)
+
+        self._journal_size = end
+        self._journal_id = file_id(self.journal_path)
+        self._foreign_writes = False
+        self._unread = []
+
+    def changes(self):
+        """
+        Returns the journaled operations written by other instances since the journal was last read.
+
+        Costs two `stat` calls when nothing has changed. Rows appended to the journal are read from the offset
+        where the previous read stopped, so the rest of the journal and the dictionary file are not read again.
+        Returns None if the dictionary has to be loaded again from scratch: when another instance has replaced
+        the dictionary file or rotated the journal during a compaction.
+
+        Rows of other instances that a flush of this instance had to skip over are returned first (see `_append`).
+        """
+        with self.lock():
+            journal_id = file_id(self.journal_path)
+            size = file_size(self.journal_path)
+            if not self._journal_readable(journal_id, size):
+                return None
+
+            ops, self._unread = self._unread, []
+            if size > self._journal_size:
+                tail, self._journal_size = read_tail(self.journal_path, self._journal_size)
+                ops += tail
+                self._journal_id = journal_id
+            self._foreign_writes = False
+            return ops
+
+    def search(self, query, limit=20):
+        """
+        Returns None: the dictionary file has no full-text index, so the store's in-memory index is used.
+        """
+        return None
+
+    def lock(self):
+        """
+        Returns a context manager holding the lock shared by every instance using this dictionary.
+
+        Hold it while reading the file and the journal, so that another instance cannot rotate the journal
+        halfway through.
+        """
+        return FileLock(self.lock_path)
+
+    def add(self, row):
+        """
+        Journals the addition of a record.
+        """
+        self._log([['add'] + list(row)])
+
+    def add_many(self, rows):
+        """
+        Journals the addition of several records with a single write.
+        """
+        self._log(['add'] + list(row) for row in rows)
+
+    def delete(self, key):
+        """
+        Journals the deletion of every record with the given key.
+        """
+        self._log([['delete'] + list(key)])
+
+    def edit(self, old_key, row):
+        """
+        Journals the replacement of the first record with the given key.
+        """
+        self._log([['edit'] + list(old_key) + list(row)])
+
+    def needs_compaction(self):
+        """
+        Checks whether the journal has grown past the compaction threshold and holds only this instance's changes.
+        """
+        return self._journal_size >= self.compact_threshold and not self._foreign_writes
+
+    def compact(self, records, wait=False):
+        """
+        Folds the journal into a new snapshot of the dictionary file holding the given records.
+
+        The current journal is rotated to `dictionary.csv.journal.old`, so further changes go into a fresh
+        journal while the snapshot is written, and a last `snapshot` row records the signature of the dictionary
+        file it applies to. The snapshot is written to a temporary file by a background thread, flushed to disk and
+        moved over the dictionary file, after which the rotated journal is removed. If the process stops partway
+        through, the dictionary file is either the old or the new snapshot, never a truncated one. The rotated
+        journal is replayed at the next load only while the dictionary file is still the one it applies to, since
+        replaying it on top of the new snapshot would apply its edits and additions twice. If the snapshot cannot
+        be written, the rotated journal is moved back in front of the current one and the next change tries again.
+
+        `records` is read by the background thread, so it must not change afterwards: pass a copy. Nothing is done
+        if another instance has journaled changes that `records` may not include.
+        """
+        if self._compaction is not None and self._compaction.is_alive():
+            if wait:
+                self._compaction.join()
+            return
+
+        self.flush()
+        with self.lock():
+            drop_partial_row(self.journal_path)
+            if (file_size(self.journal_path) != self._journal_size
+                    or file_signature(self.path) != self._snapshot_signature):
+                self._foreign_writes = True
+            if self._foreign_writes or self._rotated_rows() or not os.path.exists(self.journal_path):
+                return
+            os.replace(self.journal_path, self.journal_path + '.old')
+            with open(self.journal_path + '.old', 'a', newline='') as f:
+                csv.writer(f, delimiter=';').writerow(['snapshot'] + list(file_signature(self.path) or ()))
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_size = 0
+            self._journal_id = None
+
+        self._compaction = threading.Thread(target=self._write_snapshot, args=(records,), daemon=True)
+        self._compaction.start()
+        if wait:
+            self._compaction.join()
+
+    def flush(self):
+        """
+        Appends the buffered operations to the journal with a single write and fsync.
+
+        If the write fails, the operations stay buffered, another flush is scheduled and the error is raised.
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                ops, self._buffer = self._buffer, []
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+            if not ops:
+                return
+
+            try:
+                self._append(ops)
+            except Exception as e:
+                with self._buffer_lock:
+                    self._buffer[:0] = ops
+                    self._write_error = e
+                    self._schedule_flush()
+                raise
+            self._write_error = None
+
+    def take_write_error(self):
+        """
+        Returns the error of the last failed flush if no flush has succeeded since, else None, and forgets it.
+
+        Flushes usually run on a timer thread, where their errors cannot be raised to the application.
+        """
+        with self._buffer_lock:
+            error, self._write_error = self._write_error, None
+        return error
+
+    def close(self):
+        """
+        Flushes the buffered operations and waits for a running compaction to finish.
+        """
+        self.flush()
+        if self._compaction is not None:
+            self._compaction.join()
+
+    def _log(self, ops):
+        with self._buffer_lock:
+            self._buffer.extend(ops)
+            self._schedule_flush(0 if len(self._buffer) >= self.flush_operations else self.flush_interval)
+
+    def _schedule_flush(self, delay=None):
+        # Call with `_buffer_lock` held. An earlier flush already scheduled is brought forward, never delayed.
+        if delay is None:
+            delay = self.flush_interval
+        if self._flush_timer is not None:
+            if delay >= self.flush_interval:
+                return
+            self._flush_timer.cancel()
+        self._flush_timer = threading.Timer(delay, self._flush_in_background)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception:
+            pass  # kept for `take_write_error`, and retried
+
+    def _append(self, ops):
+        with self.lock():
+            journal_id = file_id(self.journal_path)
+            # A row cut short by a crash would be glued to the first of ours.
+            size = drop_partial_row(self.journal_path)
+            readable = self._journal_readable(journal_id, size)
+            if readable and size > self._journal_size:
+                # Rows of other instances precede ours. Keep them for `changes()` and skip over ours, which this
+                # instance has already applied: reading them back would apply them twice.
+                unread, self._journal_size = read_tail(self.journal_path, self._journal_size)
+                self._unread += unread
+                self._foreign_writes = True
+
+            with open(self.journal_path, 'a', newline='') as f:
+                writer = csv.writer(f, delimiter=';')
+                writer.writerows(ops)
+                f.flush()
+                os.fsync(f.fileno())
+                end = f.tell()
+
+            if readable:
+                self._journal_size = end
+                self._journal_id = file_id(self.journal_path)
+            else:
+                # The dictionary file or the journal was replaced: `changes()` asks for a full reload.
+                self._foreign_writes = True
+
+    def _journal_readable(self, journal_id, size):
+        return (file_signature(self.path) == self._snapshot_signature and size >= self._journal_size
+                and self._journal_id in (None, journal_id))
+
+    def _rotated_rows(self):
+        old_path = self.journal_path + '.old'
+        rows = list(read_rows(old_path))
+        if rows and rows[-1][0] == 'snapshot':
+            if rows.pop()[1:] != [str(value) for value in file_signature(self.path) or ()]:
+                # Already folded into the dictionary file by the compaction that rotated it.
+                with contextlib.suppress(OSError):
+                    os.remove(old_path)
+                return []
+        return rows
+
+    def _write_snapshot(self, records):
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w', newline='') as f:
+                writer = csv.writer(f, delimiter=';')
+                writer.writerows(records)
+                f.flush()
+                os.fsync(f.fileno())
+
+            with self.lock():
+                os.replace(temp_path, self.path)
+                self._snapshot_signature = file_signature(self.path)
+        except Exception:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            self._restore_journal()
+            return
+
+        with self.lock(), contextlib.suppress(OSError):
+            os.remove(self.journal_path + '.old')
+            fsync_directory(self.path)
+
+    def _restore_journal(self):
+        # Puts the rows of the rotated journal back in front of the rows journaled since the rotation.
+        old_path = self.journal_path + '.old'
+        temp_path = self.journal_path + '.tmp'
+        try:
+            with self.lock():
+                with open(temp_path, 'w', newline='') as f:
+                    csv.writer(f, delimiter=';').writerows(self._rotated_rows())
+                    f.flush()
+                    start = os.fstat(f.fileno()).st_size
+                    with contextlib.suppress(FileNotFoundError), open(self.journal_path, 'r', newline='') as journal:
+                        shutil.copyfileobj(journal, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                readable = self._journal_readable(file_id(self.journal_path), file_size(self.journal_path))
+                os.replace(temp_path, self.journal_path)
+                os.remove(old_path)
+                fsync_directory(self.path)
+                if readable:
+                    self._journal_size += start
+                    self._journal_id = file_id(self.journal_path)
+                else:
+                    self._snapshot_signature = None
+        except OSError:
+            # The rotated journal stays, and is still replayed on top of the dictionary file it applies to.
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+
+
+class SqliteBackend:
+    """
+    Storage backend keeping the dictionary in an SQLite database.
+
+    Records live in an `entries` table indexed on word and on (word, part-of-speech), so the edits and deletes
+    passed on by the dictionary store are index probes. When the SQLite build supports FTS5, an external-content
+    `entries_fts` table kept in sync by triggers answers searches by meaning, so the store does not have to build
+    its in-memory full-text index.
+
+    This backend is a storage format, not a faster way to open a dictionary: the store still reads every record
+    into memory at startup and answers lookups and duplicate checks from its own indexes, and there is no parse
+    cache, so a database opens more slowly than the same records in a CSV file.
+
+    Several instances can share a database. Triggers record every insert, delete and update of `entries` in an
+    `entries_log` table, in the operation format of the CSV journal, and `changes()` returns the rows that other
+    connections have added to it since it was last read. Only the last `CHANGE_LOG_ROWS` rows are kept; an
+    instance that has fallen further behind, for example after a bulk import, loads the dictionary again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.has_fts = True
+        self._data_version = None
+        self._last_seq = 0
+        self._unread = []
+        self._behind = False
+
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY,
+                    word TEXT NOT NULL,
+                    pos TEXT NOT NULL,
+                    definition TEXT NOT NULL,
+                    synonyms TEXT NOT NULL DEFAULT '',
+                    antonyms TEXT NOT NULL DEFAULT ''
+                );
+                CREATE INDEX IF NOT EXISTS entries_word ON entries (word);
+                CREATE INDEX IF NOT EXISTS entries_word_pos ON entries (word, pos);
+                CREATE TABLE IF NOT EXISTS entries_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    op TEXT NOT NULL,
+                    old_word TEXT,
+                    old_pos TEXT,
+                    old_definition TEXT,
+                    word TEXT,
+                    pos TEXT,
+                    definition TEXT,
+                    synonyms TEXT,
+                    antonyms TEXT
+                );
+                CREATE TRIGGER IF NOT EXISTS entries_log_ai AFTER INSERT ON entries BEGIN
+                    INSERT INTO entries_log (op, word, pos, definition, synonyms, antonyms)
+                        VALUES ('add', new.word, new.pos, new.definition, new.synonyms, new.antonyms);
+                END;
+                CREATE TRIGGER IF NOT EXISTS entries_log_ad AFTER DELETE ON entries BEGIN
+                    INSERT INTO entries_log (op, old_word, old_pos, old_definition)
+                        VALUES ('delete', old.word, old.pos, old.definition);
+                END;
+                CREATE TRIGGER IF NOT EXISTS entries_log_au AFTER UPDATE ON entries BEGIN
+                    INSERT INTO entries_log (op, old_word, old_pos, old_definition, word, pos, definition, synonyms,
+                                             antonyms)
+                        VALUES ('edit', old.word, old.pos, old.definition, new.word, new.pos, new.definition,
+                                new.synonyms, new.antonyms);
+                END;
+            """)
+
+        try:
+            with self.conn:
+                self.conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts
+                        USING fts5(definition, content='entries', content_rowid='id');
+                    CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+                        INSERT INTO entries_fts (rowid, definition) VALUES (new.id, new.definition);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+                        INSERT INTO entries_fts (entries_fts, rowid, definition)
+                            VALUES ('delete', old.id, old.definition);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+                        INSERT INTO entries_fts (entries_fts, rowid, definition)
+                            VALUES ('delete', old.id, old.definition);
+                        INSERT INTO entries_fts (rowid, definition) VALUES (new.id, new.definition);
+                    END;
+                """)
+        except sqlite3.OperationalError:
+            self.has_fts = False
+
+    def search(self, query, limit=20):
+        """
+        Returns up to `limit` records whose definition best matches a query, ranked with FTS5's BM25.
+
+        The query is split into terms like the store's in-memory index does, and any of them may match. Returns
+        None when FTS5 is unavailable, so the store's in-memory index is used instead.
+        """
+        if not self.has_fts:
+            return None
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        cursor = self.conn.execute(
+            "SELECT e.word, e.pos, e.definition, e.synonyms, e.antonyms FROM entries_fts "
+            "JOIN entries e ON e.id = entries_fts.rowid WHERE entries_fts MATCH ? ORDER BY rank LIMIT ?",
+            (match, limit))
+        return [Entry(*row) for row in cursor]
+
+    def lock(self):
+        """
+        Returns a context manager that does nothing: SQLite locks the database itself.
+        """
+        return contextlib.nullcontext()
+
+    def rows(self):
+        """
+        Yields the stored records in insertion order.
+
+        The records and the position in the change log are read in one transaction, so `changes()` returns exactly
+        the changes committed after them.
+        """
+        self.conn.execute("BEGIN")
+        try:
+            self._data_version = self._current_data_version()
+            self._last_seq = self.conn.execute("SELECT coalesce(max(seq), 0) FROM entries_log").fetchone()[0]
+            self._unread = []
+            self._behind = False
+            for row in self.conn.execute("SELECT word, pos, definition, synonyms, antonyms FROM entries ORDER BY id"):
+                yield Entry(*row)
+        finally:
+            self.conn.commit()
+
+    def read_cache(self):
+        """
+        Returns None: the database is indexed on disk and needs no cache.
+        """
+        return None
+
+    def write_cache(self, state):
+        """
+        Does nothing: the database is indexed on disk and needs no cache.
+        """
+
+    def operations(self):
+        """
+        Yields nothing: every change is applied to the database as it happens.
+        """
+        return iter(())
+
+    def changes(self):
+        """
+        Returns the operations other connections have committed since the database was last read.
+
+        Costs one pragma when nothing has changed. Returns None if the dictionary has to be loaded again from
+        scratch: when the rows of the change log it has not read were already dropped, or the database was
+        replaced. Rows of other connections that a write of this one had to skip over are returned first.
+        """
+        data_version = self._current_data_version()
+        if data_version == self._data_version and not self._unread and not self._behind:
+            return []
+
+        self._data_version = data_version
+        unread = self._read_log()
+        if unread is None:
+            return None
+        ops, self._unread = self._unread + unread, []
+        return ops
+
+    def add(self, row):
+        """
+        Inserts a record.
+        """
+        self.add_many([row])
+
+    def add_many(self, rows):
+        """
+        Inserts several records in one transaction.
+        """
+        self._write(lambda: self.conn.executemany(
+            "INSERT INTO entries (word, pos, definition, synonyms, antonyms) VALUES (?, ?, ?, ?, ?)", rows))
+
+    def delete(self, key):
+        """
+        Deletes every record with the given key.
+        """
+        self._write(lambda: self.conn.execute(
+            "DELETE FROM entries WHERE word = ? AND pos = ? AND definition = ?", key))
+
+    def edit(self, old_key, row):
+        """
+        Replaces the first record with the given key, keeping its position.
+        """
+        self._write(lambda: self.conn.execute(
+            "UPDATE entries SET word = ?, pos = ?, definition = ?, synonyms = ?, antonyms = ? "
+            "WHERE id = (SELECT id FROM entries WHERE word = ? AND pos = ? AND definition = ? "
+            "ORDER BY id LIMIT 1)", list(row) + list(old_key)))
+
+    def flush(self):
+        """
+        Does nothing: every change is committed to the database as it happens.
+        """
+
+    def take_write_error(self):
+        """
+        Returns None: changes are committed as they happen, and their errors raised to the caller.
+        """
+        return None
+
+    def needs_compaction(self):
+        """
+        Returns False: the database never needs compacting by the application.
+        """
+        return False
+
+    def compact(self, records, wait=False):
+        """
+        Does nothing: the database never needs compacting by the application.
+        """
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self.conn.close()
+
+    def _write(self, statement):
+        # Runs a change in a write transaction. Rows other connections logged before it are kept for `changes()`,
+        # and the rows it logs itself are skipped, as this instance has already applied the change.
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            unread = self._read_log()
+            statement()
+            self._last_seq = self.conn.execute("SELECT coalesce(max(seq), 0) FROM entries_log").fetchone()[0]
+            self.conn.execute("DELETE FROM entries_log WHERE seq <= ?", (self._last_seq - CHANGE_LOG_ROWS,))
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        if unread is None:
+            self._behind = True
+        else:
+            self._unread += unread
+
+    def _read_log(self):
+        # Returns the operations logged after `_last_seq` and moves past them, or None if some were dropped.
+        first, last = self.conn.execute("SELECT min(seq), max(seq) FROM entries_log").fetchone()
+        if self._behind or (last or 0) < self._last_seq or (first is not None and first > self._last_seq + 1):
+            return None
+
+        ops = []
+        for seq, op, *fields in self.conn.execute(
+                "SELECT seq, op, old_word, old_pos, old_definition, word, pos, definition, synonyms, antonyms "
+                "FROM entries_log WHERE seq > ? ORDER BY seq", (self._last_seq,)):
+            if op == 'add':
+                ops.append([op] + fields[3:])
+            elif op == 'delete':
+                ops.append([op] + fields[:3])
+            else:
+                ops.append([op] + fields)
+            self._last_seq = seq
+        return ops
+
+    def _current_data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on a file, held by a `with` block.
+
+    Uses `flock` on POSIX systems and `msvcrt.locking` on Windows. The lock file is created if needed and never
+    removed. The lock is not reentrant: do not acquire it again in a block already holding it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, 'a+b')
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        else:
+            self.file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ten seconds; keep waiting for the other instance.
+                    continue
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+            else:
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self.file.close()
+            self.file = None
+
+
+def file_size(path):
+    """
+    Returns the size of a file in bytes, or 0 if it does not exist.
+    """
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def file_id(path):
+    """
+    Returns the (device, inode) pair identifying a file, or None if it does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def file_signature(path):
+    """
+    Returns the (device, inode, size, modification time) of a file, or None if it does not exist.
+
+    The signature changes whenever the file is replaced or rewritten.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def cache_signature(path):
+    """
+    Returns the size, modification time and content digest of a file, or None if it does not exist.
+
+    The digest covers the first and last `DIGEST_SAMPLE_SIZE` bytes of the file rather than all of it, so checking
+    a large file costs two small reads; together with the size and modification time it still tells a file that
+    was copied, restored or edited in place apart from the one a cache was built from.
+    """
+    try:
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            digest = hashlib.blake2b(f.read(DIGEST_SAMPLE_SIZE))
+            if stat.st_size > DIGEST_SAMPLE_SIZE:
+                f.seek(max(DIGEST_SAMPLE_SIZE, stat.st_size - DIGEST_SAMPLE_SIZE))
+                digest.update(f.read())
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns, digest.hexdigest()
+
+
+def fsync_directory(path):
+    """
+    Flushes the directory entry of a file to disk after it has been created, renamed or replaced.
+
+    Does nothing on Windows, where directories cannot be opened.
+    """
+    if fcntl is None:
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def complete_size(path):
+    """
+    Returns the size of a file up to the end of its last line terminator, or 0 if it does not exist.
+
+    The rows of a journal are appended whole, each ending with a line terminator, so anything after the last one
+    is a row cut short by a crash in the middle of an append.
+    """
+    try:
+        with open(path, 'rb') as f:
+            end = f.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(0, end - io.DEFAULT_BUFFER_SIZE)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b'\n')
+                if newline >= 0:
+                    return start + newline + 1
+                end = start
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def drop_partial_row(path):
+    """
+    Cuts a row left incomplete by a crash off the end of a journal (see `complete_size`). Returns the new size.
+
+    Call it with the lock held.
+    """
+    end = complete_size(path)
+    if file_size(path) > end:
+        with open(path, 'r+b') as f:
+            f.truncate(end)
+            os.fsync(f.fileno())
+    return end
+
+
+def read_tail(path, offset):
+    """
+    Returns the non-empty complete rows of a journal from a byte offset on, and the offset where they end.
+    """
+    end = max(offset, complete_size(path))
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(end - offset)
+    text = io.TextIOWrapper(io.BytesIO(data), newline='')
+    return [row for row in csv.reader(text, delimiter=';') if row], end
+
+
+def read_rows(path, end=None):
+    """
+    Yields the non-empty rows of a semicolon-delimited file, or nothing if the file does not exist.
+
+    With `end`, only the rows in the first `end` bytes of the file are read.
+    """
+    try:
+        with open(path, 'r', newline='') as f:
+            lines = f if end is None else io.StringIO(f.buffer.read(end).decode(f.encoding), newline='')
+            for row in csv.reader(lines, delimiter=';'):
+                if row:
+                    yield row
+    except FileNotFoundError:
+        return
+
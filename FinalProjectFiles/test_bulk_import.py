@@ -0,0 +1,55 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from bulk_import import import_rows, read_source
+from dictionary import Dictionary
+from entry import Entry
+
+
+class ImportRowsTest(unittest.TestCase):
+    """
+    Validating, deduplicating and appending rows to a dictionary, as in `bulk_import.import_rows`.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dictionary.csv')
+        with open(self.path, 'w', newline='') as f:
+            f.write("cat;noun;a pet;;\r\n")
+        with open(self.path + '.journal', 'w', newline='') as f:
+            f.write("add;dog;noun;a loyal pet;;\r\ndelete;cat;noun;a pet\r\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_rows_are_checked_and_appended(self):
+        source = io.StringIO('{"word": "eel", "pos": "noun", "definition": "a long fish"}\n'
+                             '{"word": "eel"\n'
+                             '{"word": "fox", "pos": "noun"}\n'
+                             '{"word": "dog", "pos": "noun", "definition": "a loyal pet"}\n'
+                             '{"word": "cat", "pos": "noun", "definition": "a pet"}\n'
+                             '{"word": "eel", "pos": "noun", "definition": "a long fish"}\n')
+        rejects = []
+
+        class Writer:
+            def writerow(self, row):
+                rejects.append(row[-1])
+
+        report = import_rows(self.path, read_source(source, 'jsonl'), batch_size=1, rejects=Writer())
+        self.assertEqual((report.read, report.imported), (6, 2))
+        self.assertEqual(report.rejected, {"malformed line": 1, "missing word, part-of-speech or definition": 1,
+                                           "duplicate entry": 2})
+        self.assertEqual(rejects, ["malformed line", "missing word, part-of-speech or definition",
+                                   "duplicate entry", "duplicate entry"])
+
+        dictionary = Dictionary(self.path)
+        self.assertEqual(dictionary.lookup('cat'), [Entry('cat', 'noun', 'a pet')])
+        self.assertEqual(dictionary.count('dog'), 1)
+        self.assertEqual(dictionary.count('eel'), 1)
+        dictionary.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from bulk_import import import_rows
+from dictionary import Dictionary
+from entry import Entry
+
+
+class KeyIndexTest(unittest.TestCase):
+    """
+    Duplicate checks, deletes and replayed changes found through the key index of `DictionaryStore`.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dictionary.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_replay_after_bulk_import_of_one_headword(self):
+        import_rows(self.path, (Entry('set', 'verb', f"meaning {i}") for i in range(3000)))
+
+        start = time.perf_counter()
+        dictionary = Dictionary(self.path)
+        elapsed = time.perf_counter() - start
+        self.assertEqual(dictionary.count('set'), 3000)
+        dictionary.close()
+        self.assertLess(elapsed, 3)
+
+    def test_key_index_follows_changes_and_cache(self):
+        with open(self.path, 'w', newline='') as f:
+            f.write("w;noun;d;;\r\nw;noun;d;;\r\nw;verb;d;;\r\n")
+        dictionary = Dictionary(self.path)
+        dictionary.edit('w', 3, Entry('x', 'noun', 'd'))
+        dictionary.add(Entry('w', 'verb', 'd'))
+        dictionary.delete('w', 'noun', 'd')
+        self.assertEqual(dictionary.lookup('w'), [Entry('w', 'verb', 'd')])
+        self.assertTrue(dictionary.store.contains('x', 'noun', 'd'))
+        self.assertFalse(dictionary.store.contains('w', 'noun', 'd'))
+        dictionary.close()
+
+        for _ in range(2):  # parsed, then from the cache
+            reloaded = Dictionary(self.path)
+            self.assertTrue(reloaded.store.contains('w', 'verb', 'd'))
+            reloaded.delete('x', 'noun', 'd')
+            self.assertEqual(reloaded.count('x'), 0)
+            reloaded.add(Entry('x', 'noun', 'd'))
+            reloaded.close()
+        self.assertTrue(os.path.exists(self.path + '.cache'))
+
+
+if __name__ == '__main__':
+    unittest.main()
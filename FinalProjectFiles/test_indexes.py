@@ -0,0 +1,145 @@
+import os
+import shutil
+import tempfile
+import unittest
+from definition_index import DefinitionIndex
+from dictionary import Dictionary
+from entry import Entry
+from prefix_index import PrefixIndex
+from spelling_index import SpellingIndex
+from thesaurus import ThesaurusGraph
+
+
+class PrefixIndexTest(unittest.TestCase):
+    """
+    Prefix completion over the headwords, with reference counts per word.
+    """
+
+    def test_complete_and_counts(self):
+        index = PrefixIndex({'cat': 1, 'car': 2, 'dog': 1})
+        self.assertEqual(index.complete('ca'), ['car', 'cat'])
+        self.assertEqual(index.complete('c', 1), ['car'])
+
+        self.assertFalse(index.remove('car'))
+        self.assertTrue(index.remove('car'))
+        self.assertTrue(index.add('cab'))
+        self.assertFalse(index.add('cab'))
+        self.assertEqual(index.complete('ca'), ['cab', 'cat'])
+        self.assertNotIn('car', index)
+
+
+class SpellingIndexTest(unittest.TestCase):
+    """
+    "Did you mean" suggestions within two edits.
+    """
+
+    def test_suggest(self):
+        index = SpellingIndex(['apple', 'apply', 'ample', 'maple', 'banana'])
+        self.assertEqual(index.suggest('appel'), ['apple', 'apply'])
+        self.assertEqual(index.suggest('bananas'), ['banana'])
+        self.assertEqual(index.suggest('zzz'), [])
+
+        index.remove('apple')
+        self.assertEqual(index.suggest('appel', 2), ['apply'])
+
+
+class DefinitionIndexTest(unittest.TestCase):
+    """
+    Reverse lookup over the definitions, ranked with BM25.
+    """
+
+    def test_search(self):
+        index = DefinitionIndex([(0, Entry('cat', 'noun', 'a small furry animal')),
+                                 (1, Entry('dog', 'noun', 'a loyal animal')),
+                                 (2, Entry('run', 'verb', 'to move fast'))])
+        self.assertEqual([record_id for record_id, score in index.search('furry animal')], [0, 1])
+        self.assertEqual(index.search('nothing'), [])
+
+        index.record_removed(0, Entry('cat', 'noun', 'a small furry animal'))
+        self.assertEqual([record_id for record_id, score in index.search('furry animal')], [1])
+
+
+class ThesaurusGraphTest(unittest.TestCase):
+    """
+    Synonym and antonym links, in both directions and over several hops.
+    """
+
+    def test_links_and_expand(self):
+        graph = ThesaurusGraph([(0, Entry('big', 'adjective', 'of great size', 'large, huge', 'small')),
+                                (1, Entry('large', 'adjective', 'big', 'big, vast'))])
+        self.assertEqual(graph.neighbours('big'), ['huge', 'large'])
+        self.assertEqual(graph.reverse_neighbours('big'), ['large'])
+        self.assertEqual(graph.neighbours('big', 'antonyms'), ['small'])
+        self.assertEqual(graph.expand('big', 2), {'large': 1, 'huge': 1, 'vast': 2})
+        self.assertEqual(graph.asymmetric_links(), [('big', 'huge'), ('large', 'vast')])
+
+        graph.record_removed(1, Entry('large', 'adjective', 'big', 'big, vast'))
+        self.assertEqual(graph.reverse_neighbours('big'), [])
+        self.assertEqual(graph.expand('big', 2), {'large': 1, 'huge': 1})
+
+
+class IncrementalIndexTest(unittest.TestCase):
+    """
+    The indexes of a `Dictionary` follow its changes, and those of another instance, without being rebuilt.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dictionary.csv')
+        with open(self.path, 'w', newline='') as f:
+            f.write("big;adjective;of great size;large, huge;small\r\n"
+                    "large;adjective;big;big;little\r\n"
+                    "small;adjective;of little size;little;big\r\n")
+        self.dictionary = Dictionary(self.path)
+        self.other = Dictionary(self.path)
+
+    def tearDown(self):
+        self.dictionary.close()
+        self.other.close()
+        shutil.rmtree(self.directory)
+
+    def assertIndexesMatchRebuilt(self):
+        dictionary = self.dictionary
+        records = list(dictionary.store.records.items())
+        words = list(dictionary.store.words())
+
+        rebuilt = PrefixIndex({word: dictionary.store.count(word) for word in words})
+        self.assertEqual(dictionary.word_index.counts, rebuilt.counts)
+        self.assertEqual(dictionary.word_index.words, rebuilt.words)
+
+        self.assertEqual(dictionary.spelling_index.buckets, SpellingIndex(words).buckets)
+
+        rebuilt = DefinitionIndex(records)
+        self.assertEqual(dictionary.definition_index.postings, rebuilt.postings)
+        self.assertEqual(dictionary.definition_index.lengths, rebuilt.lengths)
+        self.assertEqual(dictionary.definition_index.total_length, rebuilt.total_length)
+
+        graph, rebuilt = dictionary.thesaurus_graph, ThesaurusGraph(records)
+        for word in set(graph.names) | set(rebuilt.names):
+            for kind in ('synonyms', 'antonyms'):
+                self.assertEqual(graph.neighbours(word, kind), rebuilt.neighbours(word, kind))
+                self.assertEqual(graph.reverse_neighbours(word, kind), rebuilt.reverse_neighbours(word, kind))
+
+    def test_indexes_follow_changes(self):
+        self.dictionary.suggest('bgi')
+        self.dictionary.search('size')
+        self.dictionary.thesaurus()
+
+        self.dictionary.add(Entry('huge', 'adjective', 'of very great size', 'big, vast'))
+        self.dictionary.edit('large', 1, Entry('great', 'adjective', 'big', 'big'))
+        self.dictionary.delete('small', 'adjective', 'of little size')
+        self.assertIndexesMatchRebuilt()
+        self.assertEqual(self.dictionary.suggest('grate'), ['great'])
+        self.assertEqual(self.dictionary.complete('s'), [])
+
+        self.other.add(Entry('tiny', 'adjective', 'of very little size', 'small', 'huge'))
+        self.other.delete('big', 'adjective', 'of great size')
+        self.other.flush()
+        self.assertEqual(self.dictionary.refresh(), {'tiny', 'big'})
+        self.assertIndexesMatchRebuilt()
+        self.assertEqual(self.dictionary.complete('t'), ['tiny'])
+        self.assertEqual([entry.word for entry in self.dictionary.search('little size')], ['tiny', 'huge'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from unittest import mock
+import latency
+
+
+class LatencyTest(unittest.TestCase):
+    """
+    Per-operation latency statistics, as in `latency.py`.
+    """
+
+    def test_summary_covers_the_latest_samples(self):
+        stats = latency.OperationStats(size=4)
+        for milliseconds in (100, 1, 2, 3, 4):
+            stats.add(milliseconds / 1000)
+        summary = stats.summary()
+        self.assertEqual(summary['count'], 5)
+        self.assertAlmostEqual(summary['mean_us'], 22000)
+        self.assertAlmostEqual(summary['p50_us'], 3000)
+        self.assertAlmostEqual(summary['max_us'], 4000)
+
+    def test_timed_only_when_enabled(self):
+        def lookup():
+            return latency.track(lambda: 'done')
+
+        with mock.patch('latency.recorder', None):
+            self.assertIs(latency.timed(lookup), lookup)
+            self.assertEqual(latency.format_summary().count("\n"), 0)
+
+        with mock.patch('latency.recorder', latency.LatencyRecorder()):
+            self.assertEqual(latency.timed(lookup)()(), 'done')
+            self.assertEqual(list(latency.recorder.summary()), ['lookup', 'lookup (completed)'])
+            self.assertEqual(latency.recorder.summary()['lookup']['count'], 1)
+            self.assertEqual(latency.recorder.running, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from entry import Entry
+from record_table import RecordTable
+
+
+class RecordTableTest(unittest.TestCase):
+    """
+    The columnar record storage of `record_table.py`, read like a dict of `Entry` tuples.
+    """
+
+    def setUp(self):
+        self.table = RecordTable()
+        self.first = self.table.append(Entry('cat', 'noun', 'a pet', 'feline', 'dog'))
+        self.second = self.table.append(Entry('run', 'verb', 'to move fast'))
+
+    def test_append_replace_and_pop(self):
+        self.assertEqual(self.table[self.first], Entry('cat', 'noun', 'a pet', 'feline', 'dog'))
+        self.table.replace(self.first, Entry('cat', 'noun', 'a small pet'))
+        self.assertEqual(self.table[self.first], Entry('cat', 'noun', 'a small pet'))
+
+        self.assertEqual(self.table.pop(self.first), Entry('cat', 'noun', 'a small pet'))
+        self.assertNotIn(self.first, self.table)
+        self.assertEqual(list(self.table), [self.second])
+        self.assertEqual(len(self.table), 1)
+        with self.assertRaises(KeyError):
+            self.table.replace(self.first, Entry('cat', 'noun', 'a pet'))
+
+    def test_copy_is_independent(self):
+        copy = self.table.copy()
+        self.table.replace(self.second, Entry('run', 'verb', 'to flee'))
+        self.table.append(Entry('sit', 'verb', 'to rest'))
+        self.assertEqual(dict(copy.items()), {self.first: Entry('cat', 'noun', 'a pet', 'feline', 'dog'),
+                                              self.second: Entry('run', 'verb', 'to move fast')})
+
+    def test_many_parts_of_speech(self):
+        for code in range(70000):
+            self.table.append(Entry('w', f"pos {code}", 'd'))
+        self.assertEqual(len(self.table), 70002)
+        self.assertEqual(self.table[65536].pos, "pos 65534")
+        self.assertEqual(self.table[70001].pos, "pos 69999")
+
+    def test_failed_append_leaves_the_table_unchanged(self):
+        with self.assertRaises(UnicodeEncodeError):
+            self.table.append(Entry('bad', 'noun', 'half a surrogate pair \ud800'))
+        with self.assertRaises(UnicodeEncodeError):
+            self.table.replace(self.second, Entry('run', 'verb', '\ud800'))
+
+        self.assertEqual(len(self.table), 2)
+        self.assertEqual(list(self.table.values()), [Entry('cat', 'noun', 'a pet', 'feline', 'dog'),
+                                                     Entry('run', 'verb', 'to move fast')])
+        self.assertEqual(self.table.append(Entry('sit', 'verb', 'to rest')), 2)
+        self.assertEqual(self.table[2], Entry('sit', 'verb', 'to rest'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,294 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from dictionary import Dictionary, Entry
+from mapped_dictionary import MappedDictionary
+
+
+class SharedDictionaryTest(unittest.TestCase):
+    """
+    Two instances of the application sharing one dictionary file, as in `storage.CsvBackend`.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dictionary.csv')
+        with open(self.path, 'w', newline='') as f:
+            f.write("w;noun;d;;\r\n")
+        self.first = Dictionary(self.path)
+        self.second = Dictionary(self.path)
+
+    def tearDown(self):
+        self.first.close()
+        self.second.close()
+        shutil.rmtree(self.directory)
+
+    def definitions(self, dictionary, word):
+        return [entry.definition for entry in dictionary.lookup(word)]
+
+    def test_own_rows_after_foreign_rows_are_not_applied_twice(self):
+        self.second.add(Entry('x', 'noun', 'y'))
+        self.second.flush()
+        self.first.edit('w', 1, Entry('w', 'noun', 'd2'))
+        self.first.add(Entry('w', 'noun', 'd'))
+
+        self.assertEqual(self.first.refresh(), {'x'})
+        self.assertEqual(self.definitions(self.first, 'w'), ['d2', 'd'])
+        self.assertEqual(self.definitions(self.first, 'x'), ['y'])
+
+        self.second.refresh()
+        self.assertEqual(self.definitions(self.second, 'w'), ['d2', 'd'])
+        reloaded = Dictionary(self.path)
+        self.assertEqual(self.definitions(reloaded, 'w'), ['d2', 'd'])
+        reloaded.close()
+
+    def test_changes_of_other_instance_are_picked_up(self):
+        self.first.add(Entry('x', 'noun', 'y'))
+        self.first.flush()
+
+        self.assertEqual(self.second.refresh(), {'x'})
+        self.assertEqual(self.definitions(self.second, 'x'), ['y'])
+        self.assertEqual(self.second.refresh(), set())
+
+    def test_row_cut_short_by_a_crash_is_dropped(self):
+        self.first.add(Entry('x', 'noun', 'y'))
+        self.first.flush()
+        self.assertEqual(self.second.refresh(), {'x'})
+        with open(self.path + '.journal', 'a', newline='') as f:
+            f.write("add;bar;nou")
+
+        self.assertEqual(self.second.refresh(), set())
+        crashed = Dictionary(self.path)
+        self.assertEqual(crashed.count('bar'), 0)
+        crashed.add(Entry('baz', 'noun', 'ok'))
+        crashed.close()
+
+        self.assertEqual(self.second.refresh(), {'baz'})
+        reloaded = Dictionary(self.path)
+        self.assertEqual(reloaded.lookup('baz'), [Entry('baz', 'noun', 'ok')])
+        self.assertEqual(reloaded.count('bar'), 0)
+        self.assertEqual(reloaded.count('x'), 1)
+        reloaded.close()
+
+    def test_malformed_rows_are_not_replayed(self):
+        with open(self.path + '.journal', 'w', newline='') as f:
+            f.write("add;bar;noun\r\ndelete;w;noun\r\nedit;w;noun;d;v\r\nadd;x;noun;y;;\r\n")
+
+        self.assertEqual(self.first.refresh(), {'x'})
+        reloaded = Dictionary(self.path)
+        self.assertEqual([entry.word for entry in reloaded.store.records.values()], ['w', 'x'])
+        reloaded.close()
+
+    def test_reload_after_compaction_of_other_instance(self):
+        self.first.add(Entry('x', 'noun', 'y'))
+        store = self.first.store
+        store.backend.compact(store.records.copy().values(), wait=True)
+
+        self.assertIsNone(self.second.refresh())
+        self.assertEqual(self.second.complete('x'), ['x'])
+        self.second.add(Entry('xy', 'noun', 'z'))
+        self.assertEqual(self.second.complete('x'), ['x', 'xy'])
+
+
+class CompactionTest(unittest.TestCase):
+    """
+    Folding the journal into a new snapshot of the dictionary file, and recovering from interrupted compactions.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dictionary.csv')
+        with open(self.path, 'w', newline='') as f:
+            f.write("w;noun;d;;\r\n")
+        self.dictionary = Dictionary(self.path)
+        self.dictionary.edit('w', 1, Entry('w', 'noun', 'd2'))
+        self.dictionary.add(Entry('w', 'noun', 'd'))
+
+    def tearDown(self):
+        self.dictionary.close()
+        shutil.rmtree(self.directory)
+
+    def compact(self, records=None):
+        store = self.dictionary.store
+        store.backend.compact(store.records.copy().values() if records is None else records, wait=True)
+
+    def reloaded_definitions(self):
+        reloaded = Dictionary(self.path)
+        definitions = [entry.definition for entry in reloaded.lookup('w')]
+        reloaded.close()
+        return definitions
+
+    def test_compaction(self):
+        self.compact()
+        self.assertFalse(os.path.exists(self.path + '.journal.old'))
+        self.assertEqual(self.reloaded_definitions(), ['d2', 'd'])
+
+    def test_rotated_journal_is_not_replayed_over_new_snapshot(self):
+        with mock.patch('storage.os.remove'):
+            self.compact()
+        self.assertTrue(os.path.exists(self.path + '.journal.old'))
+
+        self.assertEqual(self.reloaded_definitions(), ['d2', 'd'])
+        self.assertFalse(os.path.exists(self.path + '.journal.old'))
+
+    def test_failed_snapshot_restores_journal(self):
+        def failing_records():
+            yield Entry('w', 'noun', 'd2')
+            raise OSError("disk full")
+
+        self.compact(failing_records())
+        self.assertFalse(os.path.exists(self.path + '.journal.old'))
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+        self.assertEqual(self.reloaded_definitions(), ['d2', 'd'])
+
+        self.dictionary.add(Entry('w', 'noun', 'd3'))
+        self.compact()
+        self.assertFalse(os.path.exists(self.path + '.journal.old'))
+        self.assertEqual(self.reloaded_definitions(), ['d2', 'd', 'd3'])
+        self.assertEqual(self.dictionary.refresh(), set())
+
+
+class WriteBehindTest(unittest.TestCase):
+    """
+    Buffered journal writes, flushed on a timer.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dictionary.csv')
+        self.dictionary = Dictionary(self.path)
+        self.dictionary.store.backend.flush_interval = 0.05
+
+    def tearDown(self):
+        self.dictionary.close()
+        shutil.rmtree(self.directory)
+
+    def test_failed_timer_flush_is_retried_and_reported(self):
+        backend = self.dictionary.store.backend
+        with mock.patch.object(backend, '_append', side_effect=OSError("disk full")):
+            self.dictionary.add(Entry('w', 'noun', 'd'))
+            time.sleep(0.2)
+        self.assertFalse(os.path.exists(self.path + '.journal'))
+
+        with self.assertRaises(OSError):
+            self.dictionary.raise_write_error()
+        time.sleep(0.2)
+        self.assertTrue(os.path.exists(self.path + '.journal'))
+        self.dictionary.raise_write_error()
+
+        reloaded = Dictionary(self.path)
+        self.assertEqual(reloaded.count('w'), 1)
+        reloaded.close()
+
+
+class SqliteBackendTest(unittest.TestCase):
+    """
+    Dictionaries kept in an SQLite database, as in `storage.SqliteBackend`.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dictionary.db')
+        self.dictionary = Dictionary(self.path)
+        self.dictionary.add(Entry('cat', 'noun', 'a small furry animal'))
+        self.dictionary.add(Entry('dog', 'noun', "man's best friend, an animal"))
+
+    def tearDown(self):
+        self.dictionary.close()
+        shutil.rmtree(self.directory)
+
+    def test_search_by_meaning_uses_the_full_text_index(self):
+        self.assertEqual([entry.word for entry in self.dictionary.search('furry animal')], ['cat', 'dog'])
+        self.assertEqual([entry.word for entry in self.dictionary.search('"best" OR')], ['dog'])
+
+        self.dictionary.edit('cat', 1, Entry('cat', 'noun', 'a feline pet'))
+        self.dictionary.delete('dog', 'noun', "man's best friend, an animal")
+        self.assertEqual(self.dictionary.search('animal'), [])
+        self.assertEqual(self.dictionary.search('feline'), [Entry('cat', 'noun', 'a feline pet')])
+        self.assertIsNone(self.dictionary.definition_index)
+
+    def test_changes_of_other_instance_are_read_from_the_change_log(self):
+        other = Dictionary(self.path)
+        try:
+            other.add(Entry('eel', 'noun', 'a long fish'))
+            self.dictionary.add(Entry('cat', 'noun', 'a pet'))
+            other.edit('dog', 1, Entry('dog', 'noun', 'a loyal pet'))
+            other.delete('cat', 'noun', 'a small furry animal')
+
+            self.assertEqual(self.dictionary.refresh(), {'eel', 'dog', 'cat'})
+            self.assertEqual(self.dictionary.lookup('cat'), [Entry('cat', 'noun', 'a pet')])
+            self.assertEqual(self.dictionary.lookup('dog'), [Entry('dog', 'noun', 'a loyal pet')])
+            self.assertEqual(self.dictionary.count('eel'), 1)
+            self.assertEqual(self.dictionary.refresh(), set())
+
+            self.assertEqual(other.refresh(), {'cat'})
+            self.assertEqual(other.lookup('cat'), [Entry('cat', 'noun', 'a pet')])
+        finally:
+            other.close()
+
+    def test_instance_behind_the_change_log_reloads(self):
+        other = Dictionary(self.path)
+        try:
+            with mock.patch('storage.CHANGE_LOG_ROWS', 2):
+                for definition in ('one', 'two', 'three'):
+                    other.add(Entry('eel', 'noun', definition))
+            self.assertIsNone(self.dictionary.refresh())
+            self.assertEqual(self.dictionary.count('eel'), 3)
+            self.assertEqual(self.dictionary.refresh(), set())
+        finally:
+            other.close()
+
+
+class MappedDictionaryTest(unittest.TestCase):
+    """
+    Building the lookup file of a read-only dictionary from the dictionary file and its journal.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dictionary.csv')
+        with open(self.path, 'w', newline='') as f:
+            f.write("w;noun;d;;\r\n")
+        with open(self.path + '.journal', 'w', newline='') as f:
+            f.write("add;x;noun;y;;\r\n" * 2 + "edit;w;noun;d;w;noun;d2;;\r\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_lookup_file_is_built_without_changing_the_dictionary(self):
+        dictionary = MappedDictionary(self.path)
+        self.assertEqual([entry.definition for entry in dictionary.lookup('w')], ['d2'])
+        self.assertEqual(dictionary.count('x'), 1)
+        dictionary.close()
+
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ['dictionary.csv', 'dictionary.csv.journal', 'dictionary.csv.lookup'])
+        with open(self.path, newline='') as f:
+            self.assertEqual(f.read(), "w;noun;d;;\r\n")
+
+        dictionary = MappedDictionary(self.path)
+        self.assertEqual(dictionary.count('x'), 1)
+        dictionary.close()
+
+    def test_reads_do_not_wait_for_an_index_build(self):
+        dictionary = MappedDictionary(self.path)
+        results = []
+
+        def read():
+            results.append((dictionary.complete(''), dictionary.count('x'), dictionary.entry('w', 1).definition))
+
+        with dictionary.build_lock:
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(5)
+            self.assertEqual(results, [(['w', 'x'], 1, 'd2')])
+        self.assertEqual(dictionary.suggest('xx'), ['x', 'w'])
+        dictionary.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import sys
+from collections import deque
+
+KINDS = ('synonyms', 'antonyms')
+
+
+class ThesaurusGraph:
+    """
+    Directed graph of the synonym and antonym links listed in the dictionary.
+
+    Every word is interned to an integer ID. For each kind of link, `forward` maps a word ID to a dict of the word
+    IDs it lists, and `reverse` maps a word ID to the word IDs listing it; both count how many records contribute
+    each link, so removing one of several records keeps the link. The graph follows the dictionary store as an
+    observer, so neighbour, reverse-neighbour and multi-hop queries never reread the dictionary file.
+    """
+
+    def __init__(self, records=()):
+        self.ids = {}
+        self.names = []
+        self.forward = {kind: {} for kind in KINDS}
+        self.reverse = {kind: {} for kind in KINDS}
+        for record_id, record in records:
+            self.record_added(record_id, record)
+
+    def intern(self, word):
+        """
+        Returns the ID of a word, assigning a new one if the word has not been seen before.
+        """
+        word_id = self.ids.get(word)
+        if word_id is None:
+            word_id = self.ids[word] = len(self.names)
+            self.names.append(word)
+        return word_id
+
+    def record_added(self, record_id, record):
+        """
+        Adds the synonym and antonym links listed by a record.
+        """
+        source = self.intern(record.word)
+        for kind in KINDS:
+            for target in map(self.intern, parse_words(getattr(record, kind))):
+                add_link(self.forward[kind], source, target)
+                add_link(self.reverse[kind], target, source)
+
+    def record_removed(self, record_id, record):
+        """
+        Removes the synonym and antonym links listed by a record.
+        """
+        source = self.ids[record.word]
+        for kind in KINDS:
+            for target in map(self.ids.get, parse_words(getattr(record, kind))):
+                remove_link(self.forward[kind], source, target)
+                remove_link(self.reverse[kind], target, source)
+
+    def neighbours(self, word, kind='synonyms'):
+        """
+        Returns the words listed as synonyms (or antonyms) of a word, in alphabetical order.
+        """
+        return self._names(self.forward[kind].get(self.ids.get(word), ()))
+
+    def reverse_neighbours(self, word, kind='synonyms'):
+        """
+        Returns the words that list a word as one of their synonyms (or antonyms), in alphabetical order.
+        """
+        return self._names(self.reverse[kind].get(self.ids.get(word), ()))
+
+    def expand(self, word, depth=2, kind='synonyms', include_reverse=False):
+        """
+        Returns the words reachable from a word in at most `depth` hops, as a {word: hops} dict.
+
+        Follows the links listed by each word; with `include_reverse`, links pointing at a word are followed too.
+        The starting word is not included.
+        """
+        start = self.ids.get(word)
+        if start is None:
+            return {}
+
+        hops = {start: 0}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if hops[current] == depth:
+                continue
+            following = list(self.forward[kind].get(current, ()))
+            if include_reverse:
+                following += self.reverse[kind].get(current, ())
+            for neighbour in following:
+                if neighbour not in hops:
+                    hops[neighbour] = hops[current] + 1
+                    queue.append(neighbour)
+
+        del hops[start]
+        return {self.names[word_id]: distance for word_id, distance in hops.items()}
+
+    def asymmetric_links(self, kind='synonyms'):
+        """
+        Returns the (word, listed word) pairs whose reverse link is missing, in alphabetical order.
+
+        Synonymy and antonymy are symmetric, so "big" listing "large" while "large" does not list "big" usually
+        means one of the two entries is incomplete.
+        """
+        forward = self.forward[kind]
+        pairs = [(self.names[source], self.names[target])
+                 for source, targets in forward.items() for target in targets
+                 if source not in forward.get(target, ())]
+        return sorted(pairs)
+
+    def _names(self, word_ids):
+        return sorted(self.names[word_id] for word_id in word_ids)
+
+
+def parse_words(text):
+    """
+    Returns the non-empty, stripped words of a comma-separated list.
+    """
+    return [word.strip() for word in text.split(',') if word.strip()]
+
+
+def add_link(adjacency, source, target):
+    """
+    Counts one more record contributing the link from source to target.
+    """
+    targets = adjacency.setdefault(source, {})
+    targets[target] = targets.get(target, 0) + 1
+
+
+def remove_link(adjacency, source, target):
+    """
+    Counts one record less contributing the link from source to target, dropping the link at zero.
+    """
+    targets = adjacency.get(source)
+    if targets is None or target not in targets:
+        return
+    targets[target] -= 1
+    if not targets[target]:
+        del targets[target]
+        if not targets:
+            del adjacency[source]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python thesaurus.py dictionary.csv")
+        sys.exit(1)
+
+    from dictionary import Dictionary
+
+    dictionary = Dictionary(sys.argv[1])
+    graph = dictionary.thesaurus()
+    for kind in KINDS:
+        pairs = graph.asymmetric_links(kind)
+        print(f"{len(pairs)} one-way {kind} links")
+        for word, listed in pairs:
+            print(f"  {word} lists {listed}, but {listed} does not list {word}")
+    dictionary.close()
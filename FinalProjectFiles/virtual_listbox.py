@@ -0,0 +1,85 @@
+import tkinter as tk
+
+WHEEL_STEP = 3
+
+
+class VirtualListbox:
+    """
+    Drives a listbox and scrollbar as a window over an arbitrarily long list of lines.
+
+    Only the lines currently visible are inserted into the listbox. The lines themselves are produced on demand by
+    a `fetch(index)` callback, and the scrollbar is driven by hand from the position of the window, so memory use
+    and redraw time depend on the height of the listbox rather than on the number of lines.
+    """
+
+    def __init__(self, listbox, scrollbar):
+        self.listbox = listbox
+        self.scrollbar = scrollbar
+        self.count = 0
+        self.fetch = None
+        self.top = 0
+
+        scrollbar.config(command=self.yview)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            listbox.bind(sequence, self._on_wheel)
+        self.redraw()
+
+    def show(self, count, fetch):
+        """
+        Shows `count` lines produced by `fetch(index)`, scrolled to the top.
+        """
+        self.count = count
+        self.fetch = fetch
+        self.top = 0
+        self.redraw()
+
+    def clear(self):
+        """
+        Empties the listbox.
+        """
+        self.show(0, None)
+
+    def visible_rows(self):
+        """
+        Returns the number of lines that fit in the listbox.
+        """
+        return int(self.listbox.cget('height'))
+
+    def yview(self, *args):
+        """
+        Scrollbar command: handles "moveto" and "scroll" requests by moving the visible window.
+        """
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.count))
+        elif args[0] == 'scroll':
+            step = self.visible_rows() if args[2] == 'pages' else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def scroll_to(self, top):
+        """
+        Moves the visible window so it starts at line `top`, clamped to the available lines.
+        """
+        self.top = max(0, min(top, self.count - self.visible_rows()))
+        self.redraw()
+
+    def redraw(self):
+        """
+        Fetches and inserts the visible lines and updates the scrollbar.
+        """
+        end = min(self.count, self.top + self.visible_rows())
+
+        self.listbox.delete(0, tk.END)
+        if end > self.top:
+            self.listbox.insert(tk.END, *[self.fetch(i) for i in range(self.top, end)])
+
+        if self.count:
+            self.scrollbar.set(self.top / self.count, end / self.count)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_wheel(self, event):
+        if event.num == 5 or event.delta < 0:
+            self.scroll_to(self.top + WHEEL_STEP)
+        else:
+            self.scroll_to(self.top - WHEEL_STEP)
+        return 'break'